@@ -221,6 +221,26 @@ class ThreatDetectionAgent:
         self.traversal_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in ThreatPatterns.DIRECTORY_TRAVERSAL_PATTERNS]
         self.command_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in ThreatPatterns.COMMAND_INJECTION_PATTERNS]
         self.ua_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in ThreatPatterns.SUSPICIOUS_USER_AGENTS]
+        
+        # One combined scan per category; the individual patterns are only
+        # consulted (in order) to report which one matched
+        self.sql_prefilter = self._combine(ThreatPatterns.SQL_INJECTION_PATTERNS)
+        self.xss_prefilter = self._combine(ThreatPatterns.XSS_PATTERNS)
+        self.traversal_prefilter = self._combine(ThreatPatterns.DIRECTORY_TRAVERSAL_PATTERNS)
+        self.command_prefilter = self._combine(ThreatPatterns.COMMAND_INJECTION_PATTERNS)
+        self.ua_prefilter = self._combine(ThreatPatterns.SUSPICIOUS_USER_AGENTS)
+    
+    @staticmethod
+    def _combine(patterns: List[str]) -> re.Pattern:
+        """Compile patterns into a single alternation regex"""
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    
+    @staticmethod
+    def _first_match(prefilter: re.Pattern, patterns: List[re.Pattern], text: str) -> Optional[re.Pattern]:
+        """Return the first pattern matching text, scanning once when nothing matches"""
+        if not prefilter.search(text):
+            return None
+        return next((pattern for pattern in patterns if pattern.search(text)), None)
     
     def generate_threat_id(self, threat_type: ThreatType, source_ip: str) -> str:
         """Generate unique threat ID"""
@@ -278,24 +298,23 @@ class ThreatDetectionAgent:
             threats.append(threat)
         
         # Check user agent
-        for pattern in self.ua_patterns:
-            if pattern.search(user_agent):
-                threat = ThreatEvent(
-                    id=self.generate_threat_id(ThreatType.SUSPICIOUS_PAYLOAD, ip),
-                    timestamp=datetime.now(),
-                    threat_type=ThreatType.SUSPICIOUS_PAYLOAD,
-                    threat_level=ThreatLevel.MEDIUM,
-                    source_ip=ip,
-                    user_agent=user_agent,
-                    endpoint=endpoint,
-                    method=method,
-                    payload=payload,
-                    description=f"Suspicious user agent detected: {user_agent}",
-                    confidence_score=0.7,
-                    metadata={'pattern_matched': pattern.pattern}
-                )
-                threats.append(threat)
-                break
+        pattern = self._first_match(self.ua_prefilter, self.ua_patterns, user_agent)
+        if pattern:
+            threat = ThreatEvent(
+                id=self.generate_threat_id(ThreatType.SUSPICIOUS_PAYLOAD, ip),
+                timestamp=datetime.now(),
+                threat_type=ThreatType.SUSPICIOUS_PAYLOAD,
+                threat_level=ThreatLevel.MEDIUM,
+                source_ip=ip,
+                user_agent=user_agent,
+                endpoint=endpoint,
+                method=method,
+                payload=payload,
+                description=f"Suspicious user agent detected: {user_agent}",
+                confidence_score=0.7,
+                metadata={'pattern_matched': pattern.pattern}
+            )
+            threats.append(threat)
         
         # Analyze payload if present
         if payload:
@@ -316,73 +335,70 @@ class ThreatDetectionAgent:
         threats = []
         
         # SQL Injection detection
-        for pattern in self.sql_patterns:
-            if pattern.search(payload):
-                threat = ThreatEvent(
-                    id=self.generate_threat_id(ThreatType.SQL_INJECTION, ip),
-                    timestamp=datetime.now(),
-                    threat_type=ThreatType.SQL_INJECTION,
-                    threat_level=ThreatLevel.HIGH,
-                    source_ip=ip,
-                    user_agent=user_agent,
-                    endpoint=endpoint,
-                    method=method,
-                    payload=payload[:500],  # Truncate for storage
-                    description=f"SQL injection attempt detected in payload",
-                    confidence_score=0.85,
-                    metadata={
-                        'pattern_matched': pattern.pattern,
-                        'payload_length': len(payload)
-                    }
-                )
-                threats.append(threat)
-                break
+        pattern = self._first_match(self.sql_prefilter, self.sql_patterns, payload)
+        if pattern:
+            threat = ThreatEvent(
+                id=self.generate_threat_id(ThreatType.SQL_INJECTION, ip),
+                timestamp=datetime.now(),
+                threat_type=ThreatType.SQL_INJECTION,
+                threat_level=ThreatLevel.HIGH,
+                source_ip=ip,
+                user_agent=user_agent,
+                endpoint=endpoint,
+                method=method,
+                payload=payload[:500],  # Truncate for storage
+                description=f"SQL injection attempt detected in payload",
+                confidence_score=0.85,
+                metadata={
+                    'pattern_matched': pattern.pattern,
+                    'payload_length': len(payload)
+                }
+            )
+            threats.append(threat)
         
         # XSS detection
-        for pattern in self.xss_patterns:
-            if pattern.search(payload):
-                threat = ThreatEvent(
-                    id=self.generate_threat_id(ThreatType.XSS_ATTACK, ip),
-                    timestamp=datetime.now(),
-                    threat_type=ThreatType.XSS_ATTACK,
-                    threat_level=ThreatLevel.HIGH,
-                    source_ip=ip,
-                    user_agent=user_agent,
-                    endpoint=endpoint,
-                    method=method,
-                    payload=payload[:500],
-                    description=f"XSS attack attempt detected in payload",
-                    confidence_score=0.8,
-                    metadata={
-                        'pattern_matched': pattern.pattern,
-                        'payload_length': len(payload)
-                    }
-                )
-                threats.append(threat)
-                break
+        pattern = self._first_match(self.xss_prefilter, self.xss_patterns, payload)
+        if pattern:
+            threat = ThreatEvent(
+                id=self.generate_threat_id(ThreatType.XSS_ATTACK, ip),
+                timestamp=datetime.now(),
+                threat_type=ThreatType.XSS_ATTACK,
+                threat_level=ThreatLevel.HIGH,
+                source_ip=ip,
+                user_agent=user_agent,
+                endpoint=endpoint,
+                method=method,
+                payload=payload[:500],
+                description=f"XSS attack attempt detected in payload",
+                confidence_score=0.8,
+                metadata={
+                    'pattern_matched': pattern.pattern,
+                    'payload_length': len(payload)
+                }
+            )
+            threats.append(threat)
         
         # Command injection detection
-        for pattern in self.command_patterns:
-            if pattern.search(payload):
-                threat = ThreatEvent(
-                    id=self.generate_threat_id(ThreatType.COMMAND_INJECTION, ip),
-                    timestamp=datetime.now(),
-                    threat_type=ThreatType.COMMAND_INJECTION,
-                    threat_level=ThreatLevel.CRITICAL,
-                    source_ip=ip,
-                    user_agent=user_agent,
-                    endpoint=endpoint,
-                    method=method,
-                    payload=payload[:500],
-                    description=f"Command injection attempt detected in payload",
-                    confidence_score=0.9,
-                    metadata={
-                        'pattern_matched': pattern.pattern,
-                        'payload_length': len(payload)
-                    }
-                )
-                threats.append(threat)
-                break
+        pattern = self._first_match(self.command_prefilter, self.command_patterns, payload)
+        if pattern:
+            threat = ThreatEvent(
+                id=self.generate_threat_id(ThreatType.COMMAND_INJECTION, ip),
+                timestamp=datetime.now(),
+                threat_type=ThreatType.COMMAND_INJECTION,
+                threat_level=ThreatLevel.CRITICAL,
+                source_ip=ip,
+                user_agent=user_agent,
+                endpoint=endpoint,
+                method=method,
+                payload=payload[:500],
+                description=f"Command injection attempt detected in payload",
+                confidence_score=0.9,
+                metadata={
+                    'pattern_matched': pattern.pattern,
+                    'payload_length': len(payload)
+                }
+            )
+            threats.append(threat)
         
         return threats
     
@@ -391,27 +407,26 @@ class ThreatDetectionAgent:
         threats = []
         
         # Directory traversal detection
-        for pattern in self.traversal_patterns:
-            if pattern.search(endpoint):
-                threat = ThreatEvent(
-                    id=self.generate_threat_id(ThreatType.DIRECTORY_TRAVERSAL, ip),
-                    timestamp=datetime.now(),
-                    threat_type=ThreatType.DIRECTORY_TRAVERSAL,
-                    threat_level=ThreatLevel.HIGH,
-                    source_ip=ip,
-                    user_agent=user_agent,
-                    endpoint=endpoint,
-                    method=method,
-                    payload=None,
-                    description=f"Directory traversal attempt detected in URL",
-                    confidence_score=0.85,
-                    metadata={
-                        'pattern_matched': pattern.pattern,
-                        'endpoint': endpoint
-                    }
-                )
-                threats.append(threat)
-                break
+        pattern = self._first_match(self.traversal_prefilter, self.traversal_patterns, endpoint)
+        if pattern:
+            threat = ThreatEvent(
+                id=self.generate_threat_id(ThreatType.DIRECTORY_TRAVERSAL, ip),
+                timestamp=datetime.now(),
+                threat_type=ThreatType.DIRECTORY_TRAVERSAL,
+                threat_level=ThreatLevel.HIGH,
+                source_ip=ip,
+                user_agent=user_agent,
+                endpoint=endpoint,
+                method=method,
+                payload=None,
+                description=f"Directory traversal attempt detected in URL",
+                confidence_score=0.85,
+                metadata={
+                    'pattern_matched': pattern.pattern,
+                    'endpoint': endpoint
+                }
+            )
+            threats.append(threat)
         
         return threats
     
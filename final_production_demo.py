@@ -7,20 +7,61 @@ Complete demonstration of the production-ready BHIV Core system.
 Shows real working features with actual API calls.
 """
 
+import argparse
 import asyncio
 import json
 import time
+from itertools import islice
+import aiohttp
 import requests
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+# Connection caps for the async load generator; keeps in-flight requests
+# within what the MCP bridge can serve instead of queueing server-side
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 50
+DEFAULT_CONCURRENCY = 50
+DEFAULT_PERFORMANCE_REQUESTS = 3  # Reduced for demo
+HEALTH_PROBE_TIMEOUT = 2  # Fail fast so an unreachable bridge skips the demo quickly
+
 class FinalProductionDemo:
     """Final production demonstration using real APIs"""
     
-    def __init__(self):
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, performance_requests=DEFAULT_PERFORMANCE_REQUESTS):
         self.demo_results = {}
         self.start_time = datetime.now()
         self.base_url = "http://localhost:8002"  # MCP Bridge
+        self.concurrency = concurrency
+        self.performance_requests = performance_requests
+        self._session = None
+        
+    async def _get_session(self):
+        """Return the shared aiohttp session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=30,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def _close_session(self):
+        """Close the shared aiohttp session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
         
     def run_complete_demo(self):
         """Run complete production demonstration"""
@@ -34,6 +75,12 @@ class FinalProductionDemo:
             # Test system health
             self._demo_system_health()
             
+            # Every downstream phase would just wait out its request timeouts
+            if self.demo_results['system_health']['status'] != 'healthy':
+                print("\n⚠️ System not healthy - skipping downstream demos")
+                self._generate_final_report()
+                return
+            
             # Test agent system with real queries
             self._demo_agent_system()
             
@@ -61,7 +108,7 @@ class FinalProductionDemo:
         print("-" * 50)
         
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=10)
+            response = requests.get(f"{self.base_url}/health", timeout=HEALTH_PROBE_TIMEOUT)
             if response.status_code == 200:
                 health_data = response.json()
                 print(f"✅ System Status: {health_data.get('status', 'unknown')}")
@@ -198,15 +245,15 @@ class FinalProductionDemo:
                     print(f"   ✅ Retrieved {len(sources)} sources")
                     print(f"   📊 RAG Method: {rag_data.get('method', 'unknown')}")
                     
-                    # Show source details
-                    for j, source in enumerate(sources[:3], 1):  # Show top 3 sources
-                        source_name = source.get('source', 'unknown')
-                        document_id = source.get('document_id', 'unknown')
-                        score = source.get('score', 0)
-                        
-                        print(f"     {j}. {source_name}")
-                        print(f"        Document ID: {document_id}")
-                        print(f"        Score: {score:.3f}")
+                    # Show source details (top 3 sources)
+                    source_lines = [
+                        f"     {j}. {source.get('source', 'unknown')}\n"
+                        f"        Document ID: {source.get('document_id', 'unknown')}\n"
+                        f"        Score: {source.get('score', 0):.3f}"
+                        for j, source in enumerate(islice(sources, 3), 1)
+                    ]
+                    if source_lines:
+                        print("\n".join(source_lines))
                     
                     total_sources += len(sources)
                     successful_retrievals += 1
@@ -310,44 +357,19 @@ class FinalProductionDemo:
         # Test concurrent requests
         print("1. Concurrent Request Handling:")
         
-        concurrent_requests = 3  # Reduced for demo
+        concurrent_requests = self.performance_requests
         query = "What is meditation in Hindu tradition?"
         
         start_time = time.time()
         
-        # Make concurrent requests (simulated with threading)
-        import threading
-        results = []
-        
-        def make_request():
-            try:
-                response = requests.post(
-                    f"{self.base_url}/handle_task",
-                    json={
-                        "agent": "vedas_agent",
-                        "input": query,
-                        "input_type": "text"
-                    },
-                    timeout=30
-                )
-                results.append(response.status_code == 200)
-            except:
-                results.append(False)
-        
-        threads = []
-        for _ in range(concurrent_requests):
-            thread = threading.Thread(target=make_request)
-            threads.append(thread)
-            thread.start()
-        
-        for thread in threads:
-            thread.join()
+        results = asyncio.run(self._run_concurrent_requests(query, concurrent_requests))
         
         end_time = time.time()
         total_time = end_time - start_time
         successful_requests = sum(results)
         
         print(f"   ✅ Concurrent requests: {concurrent_requests}")
+        print(f"   ✅ Max in-flight requests: {self.concurrency}")
         print(f"   ✅ Successful responses: {successful_requests}")
         print(f"   ✅ Total time: {total_time:.3f}s")
         print(f"   ✅ Average time per request: {total_time/concurrent_requests:.3f}s")
@@ -372,11 +394,41 @@ class FinalProductionDemo:
         
         self.demo_results['performance'] = {
             'concurrent_requests': concurrent_requests,
+            'concurrency_limit': self.concurrency,
             'successful_requests': successful_requests,
             'total_time': total_time,
             'capabilities_count': len(capabilities)
         }
     
+    async def _run_concurrent_requests(self, query, total_requests):
+        """Fan out requests over the shared session, bounded by the concurrency limit"""
+        session = await self._get_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=30)
+        url = f"{self.base_url}/handle_task"
+        
+        # Every request carries the same payload, so serialize it once
+        body = _dumps({
+            "agent": "vedas_agent",
+            "input": query,
+            "input_type": "text"
+        })
+        headers = {"Content-Type": "application/json"}
+        
+        async def make_request():
+            async with semaphore:
+                try:
+                    async with session.post(url, data=body, headers=headers, timeout=timeout) as response:
+                        await response.read()
+                        return response.status == 200
+                except Exception:
+                    return False
+        
+        try:
+            return await asyncio.gather(*(make_request() for _ in range(total_requests)))
+        finally:
+            await self._close_session()
+    
     def _generate_final_report(self):
         """Generate comprehensive final report"""
         end_time = datetime.now()
@@ -477,7 +529,14 @@ class FinalProductionDemo:
 
 def main():
     """Main demo function"""
-    demo = FinalProductionDemo()
+    parser = argparse.ArgumentParser(description="BHIV Core Final Production Demo")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum in-flight requests during the performance demo")
+    parser.add_argument("--requests", type=int, default=DEFAULT_PERFORMANCE_REQUESTS,
+                        help="Number of requests sent during the performance demo")
+    args = parser.parse_args()
+    
+    demo = FinalProductionDemo(concurrency=args.concurrency, performance_requests=args.requests)
     demo.run_complete_demo()
 
 if __name__ == "__main__":
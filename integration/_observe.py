@@ -0,0 +1,63 @@
+"""
+Fused tracing + metrics instrumentation for agent hot paths.
+
+Opens a single span and records a single business-operation metric per
+call, instead of stacking a tracing decorator on top of a metrics one.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, Dict, Optional
+
+
+class Observation:
+    """Handle yielded by ``observe`` to report the outcome of the block"""
+
+    __slots__ = ("span", "success", "record", "_loop", "_t0", "_tracing")
+
+    def __init__(self, span, loop, tracing):
+        self.span = span
+        self.success = True
+        self.record = True
+        self._loop = loop
+        self._t0 = loop.time()
+        self._tracing = tracing
+
+    def elapsed(self) -> float:
+        """Seconds since the block was entered"""
+        return self._loop.time() - self._t0
+
+    def fail(self, exception: Exception):
+        """Mark the operation failed and attach the exception to the span"""
+        self.success = False
+        if self._tracing:
+            self._tracing.record_exception(exception)
+
+    def discard(self):
+        """Leave the block out of the business metric (e.g. rejected before any work)"""
+        self.record = False
+
+
+@asynccontextmanager
+async def observe(name: str, metrics=None, tracing=None, attrs: Optional[Dict[str, Any]] = None):
+    """Trace a block as one span and record its duration/outcome as ``name``"""
+    loop = asyncio.get_running_loop()
+    span_cm = tracing.start_span(name) if tracing else nullcontext()
+
+    with span_cm as span:
+        if span is not None and attrs:
+            span.set_attributes(attrs)
+
+        obs = Observation(span, loop, tracing)
+        try:
+            yield obs
+        except Exception as e:
+            obs.fail(e)
+            raise
+        finally:
+            if metrics and obs.record:
+                metrics.record_business_operation(
+                    operation_type=name,
+                    duration=obs.elapsed(),
+                    success=obs.success
+                )
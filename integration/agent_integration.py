@@ -10,13 +10,21 @@ Integrates all existing BHIV Core agents with the new production-grade infrastru
 """
 
 import asyncio
+import functools
+import hashlib
+import inspect
 import logging
 import json
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Any
 from pathlib import Path
 import sys
 
+from cachetools import TTLCache
+from fastapi import HTTPException
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -36,292 +44,564 @@ from agents.file_search_agent import FileSearchAgent
 from agents.agent_orchestrator import AgentOrchestrator
 
 # Import observability components
-from observability.metrics import get_metrics, monitor_function, trace_business_operation
-from observability.tracing import get_tracing, trace_agent_operation
+from observability.metrics import get_metrics
+from observability.tracing import get_tracing
 from observability.alerting import send_alert, AlertSeverity
+from integration._observe import observe
 
 # Import security components
-from security.auth import verify_token, get_current_user
+from security.auth import verify_token_cached, get_current_user
 from security.rbac import check_permission, Permission
 from security.audit import audit_log
 
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def _dumps_sorted(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS, default=str)
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj)
+
+    def _dumps_sorted(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True, default=str).encode()
+
 logger = logging.getLogger(__name__)
 
+# Health probe tuning
+HEALTH_CHECK_TIMEOUT = 2.0  # seconds per agent probe
+HEALTH_CHECK_MIN_INTERVAL = 5.0  # seconds a health result is reused
+
+# Response cache for read-only agents
+RESPONSE_CACHE_MAX_SIZE = 10_000
+RESPONSE_CACHE_TTL = 300  # seconds
+CACHEABLE_AGENTS = frozenset({"summarizer", "qna", "knowledge", "file_search"})
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def _context_digest(context: Optional[Dict[str, Any]]) -> bytes:
+    return hashlib.blake2b(_dumps_sorted(context or {}), digest_size=16).digest()
+
+# Audit/alert events are handed to a small pool of queue workers so the
+# request path never waits on (or stampedes) the audit/alert sinks
+EVENT_QUEUE_MAX_SIZE = 10_000
+EVENT_WORKERS = 4
+# Queues bind to the loop that first uses them, so they are (re)created with
+# the workers for whichever loop is running
+_audit_q: Optional[asyncio.Queue] = None
+_alert_q: Optional[asyncio.Queue] = None
+_events_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_workers: List[asyncio.Task] = []
+_dropped_events: Dict[str, int] = {"audit": 0, "alert": 0}
+
+async def _audit_worker(queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        event = await queue.get()
+        try:
+            # audit_log is synchronous; keep it off the event loop
+            await loop.run_in_executor(None, functools.partial(audit_log, **event))
+        except Exception as e:
+            logger.warning(f"⚠️ Audit logging failed: {e}")
+        finally:
+            queue.task_done()
+
+async def _alert_worker(queue: asyncio.Queue):
+    while True:
+        event = await queue.get()
+        try:
+            await send_alert(**event)
+        except Exception as e:
+            logger.warning(f"⚠️ Alert delivery failed: {e}")
+        finally:
+            queue.task_done()
+
+def _start_event_workers():
+    """Spawn the audit/alert queues and workers for the running loop if needed"""
+    global _audit_q, _alert_q, _events_loop
+    loop = asyncio.get_running_loop()
+    if loop is not _events_loop:
+        # Queues and workers from a previous loop are unusable here
+        _audit_q = asyncio.Queue(maxsize=EVENT_QUEUE_MAX_SIZE)
+        _alert_q = asyncio.Queue(maxsize=EVENT_QUEUE_MAX_SIZE)
+        _events_loop = loop
+        _event_workers.clear()
+    elif any(not task.done() for task in _event_workers):
+        return
+    _event_workers.clear()
+    for _ in range(EVENT_WORKERS):
+        _event_workers.append(asyncio.create_task(_audit_worker(_audit_q)))
+        _event_workers.append(asyncio.create_task(_alert_worker(_alert_q)))
+
+def _enqueue_event(kind: str, event: Dict[str, Any]) -> None:
+    _start_event_workers()
+    queue = _audit_q if kind == "audit" else _alert_q
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # Shed load instead of growing without bound
+        _dropped_events[kind] += 1
+
+def _audit_in_background(**kwargs) -> None:
+    """Queue an audit record without blocking the caller"""
+    _enqueue_event("audit", kwargs)
+
+def _alert_in_background(**kwargs) -> None:
+    """Queue an alert without blocking the caller"""
+    _enqueue_event("alert", kwargs)
+
+def get_dropped_event_counts() -> Dict[str, int]:
+    """Audit/alert events dropped because their queue was full"""
+    return dict(_dropped_events)
+
+async def drain_background():
+    """Flush queued audit/alert events and stop the workers, e.g. during shutdown"""
+    if _events_loop is not asyncio.get_running_loop():
+        # Workers (if any) belong to another loop and can't be awaited here
+        _event_workers.clear()
+        return
+    if _event_workers:
+        await _audit_q.join()
+        await _alert_q.join()
+    for task in _event_workers:
+        task.cancel()
+    await asyncio.gather(*_event_workers, return_exceptions=True)
+    _event_workers.clear()
+
+# Agent entry points in priority order; the fallbacks are only tried for
+# agents that are not themselves callable
+_AGENT_METHODS = ("process_query", "process", "ask", "generate")
+_AGENT_FALLBACK_METHODS = ("handle", "execute", "run")
+
+class AgentConfig(NamedTuple):
+    """Static definition of a registry agent"""
+    cls: type
+    name: str
+    description: str
+
+# Agents to initialize
+AGENT_CONFIGS: Tuple[AgentConfig, ...] = (
+    AgentConfig(VedasAgent, "vedas", "Spiritual guidance and Vedic wisdom"),
+    AgentConfig(EduMentorAgent, "edumentor", "Educational content and learning support"),
+    AgentConfig(WellnessAgent, "wellness", "Mental health and wellness guidance"),
+    AgentConfig(KnowledgeAgent, "knowledge", "Knowledge retrieval and analysis"),
+    AgentConfig(ImageAgent, "image", "Image analysis and description"),
+    AgentConfig(AudioAgent, "audio", "Audio processing and transcription"),
+    AgentConfig(TextAgent, "text", "Text processing and analysis"),
+    AgentConfig(QnAAgent, "qna", "Question and answer processing"),
+    AgentConfig(SummarizerAgent, "summarizer", "Content summarization"),
+    AgentConfig(PlannerAgent, "planner", "Task planning and organization"),
+    AgentConfig(FileSearchAgent, "file_search", "File search and retrieval"),
+    AgentConfig(AgentOrchestrator, "orchestrator", "Agent coordination and routing"),
+)
+
+class AuthError(Exception):
+    """Raised when a query's user token is missing or invalid"""
+
 class EnhancedAgentWrapper:
     """Wrapper to add observability and security to existing agents"""
     
+    # Observability singletons shared by every wrapper
+    metrics = None
+    tracing = None
+    
     def __init__(self, agent, agent_name: str):
         self.agent = agent
         self.agent_name = agent_name
-        self.metrics = get_metrics()
-        self.tracing = get_tracing()
+        self._resolve_observability()
+        
+        # Per-agent constants used on every query
+        self._op_type = f"agent_{agent_name}_query"
+        self._service = f"agent_{agent_name}"
+        self._audit_action = f"agent_query_{agent_name}"
+        self._unauth_msg = f"Unauthorized access attempt to {agent_name}"
+        
+        # Resolve the agent entry point once instead of probing on every query
+        method = self._resolve_invoke()
+        invoke_target = method
+        if not inspect.isfunction(invoke_target) and not inspect.ismethod(invoke_target):
+            invoke_target = getattr(invoke_target, '__call__', invoke_target)
+        self._is_async = inspect.iscoroutinefunction(invoke_target)
+        
+        if self._is_async:
+            self._invoke = method
+        else:
+            # Synchronous agents run in the default executor to keep the loop free
+            def _invoke(query, context, _method=method):
+                return asyncio.get_running_loop().run_in_executor(None, _method, query, context)
+            self._invoke = _invoke
+    
+    @classmethod
+    def _resolve_observability(cls):
+        """Look up metrics/tracing once they have been initialized"""
+        # Not done at import time: services initialize observability after importing us
+        if cls.metrics is None:
+            cls.metrics = get_metrics()
+        if cls.tracing is None:
+            cls.tracing = get_tracing()
+    
+    def _resolve_invoke(self):
+        """Find the agent method used to process queries"""
+        agent = self.agent
         
-    @trace_agent_operation("agent_process", "query")
-    @monitor_function("agent_query_processing")
+        # Handle different agent interfaces, then the agent itself, then common names
+        method = next(
+            (getattr(agent, name) for name in _AGENT_METHODS if callable(getattr(agent, name, None))),
+            agent if callable(agent) else None
+        )
+        if method is None:
+            method = next(
+                (getattr(agent, name) for name in _AGENT_FALLBACK_METHODS if callable(getattr(agent, name, None))),
+                None
+            )
+        if method is None:
+            raise Exception(f"No suitable processing method found for agent {self.agent_name}")
+        return method
+        
+    async def ping(self) -> Dict[str, Any]:
+        """Lightweight liveness check that does not run the agent"""
+        healthy = True
+        if hasattr(self.agent, 'healthy'):
+            healthy = bool(self.agent.healthy())
+        return {"success": healthy, "processing_time": 0.0}
+    
     async def process_query(self, query: str, context: Dict[str, Any] = None, user_token: str = None):
-        """Enhanced query processing with security and observability"""
-        start_time = datetime.utcnow()
+        """Enhanced query processing with security and observability
         
-        try:
-            # Security check
-            if user_token:
-                user_payload = verify_token(user_token)
-                if not user_payload:
-                    await send_alert(
-                        name="UnauthorizedAgentAccess",
-                        severity=AlertSeverity.WARNING,
-                        message=f"Unauthorized access attempt to {self.agent_name}",
-                        service=f"agent_{self.agent_name}"
-                    )
-                    raise Exception("Unauthorized access")
+        The caller's ``context`` is never mutated; user fields from the
+        token are added to a copy.
+        """
+        qlen = len(query)
+        ctx = context
+        
+        async with observe(
+            self._op_type,
+            metrics=self.metrics,
+            tracing=self.tracing,
+            attrs={"agent.name": self.agent_name, "query.length": qlen}
+        ) as obs:
+            try:
+                # Security check
+                if user_token:
+                    try:
+                        user_payload = verify_token_cached(user_token)
+                    except HTTPException:
+                        user_payload = None
+                    if not user_payload:
+                        _alert_in_background(
+                            name="UnauthorizedAgentAccess",
+                            severity=AlertSeverity.WARNING,
+                            message=self._unauth_msg,
+                            service=self._service
+                        )
+                        raise AuthError("Unauthorized access")
+                    
+                    # Add user context
+                    ctx = dict(context) if context else {}
+                    ctx['user_id'] = user_payload.get('sub')
+                    ctx['user_role'] = user_payload.get('role')
                 
-                # Add user context
-                context = context or {}
-                context['user_id'] = user_payload.get('sub')
-                context['user_role'] = user_payload.get('role')
-            
-            # Audit log
-            await audit_log(
-                action=f"agent_query_{self.agent_name}",
-                user_id=context.get('user_id', 'anonymous') if context else 'anonymous',
-                details={
+                # Audit log
+                _audit_in_background(
+                    action=self._audit_action,
+                    user=ctx.get('user_id', 'anonymous') if ctx else 'anonymous',
+                    details={
+                        "agent": self.agent_name,
+                        "query_length": qlen,
+                        "has_context": ctx is not None
+                    }
+                )
+                
+                # Process query based on agent type
+                result = await self._invoke(query, ctx)
+                
+                return {
                     "agent": self.agent_name,
-                    "query_length": len(query),
-                    "has_context": context is not None
+                    "query": query,
+                    "result": result,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "processing_time": obs.elapsed(),
+                    "success": True
                 }
-            )
-            
-            # Process query based on agent type
-            result = await self._process_with_agent(query, context)
-            
-            # Record success metrics
-            if self.metrics:
-                self.metrics.record_business_operation(
-                    operation_type=f"agent_{self.agent_name}_query",
-                    duration=(datetime.utcnow() - start_time).total_seconds(),
-                    success=True
-                )
-            
-            # Add tracing attributes
-            if self.tracing:
-                self.tracing.set_attribute("agent.name", self.agent_name)
-                self.tracing.set_attribute("query.length", len(query))
-                self.tracing.set_attribute("result.success", True)
-            
-            return {
-                "agent": self.agent_name,
-                "query": query,
-                "result": result,
-                "timestamp": datetime.utcnow().isoformat(),
-                "processing_time": (datetime.utcnow() - start_time).total_seconds(),
-                "success": True
-            }
-            
-        except Exception as e:
-            # Record failure metrics
-            if self.metrics:
-                self.metrics.record_business_operation(
-                    operation_type=f"agent_{self.agent_name}_query",
-                    duration=(datetime.utcnow() - start_time).total_seconds(),
-                    success=False
-                )
-            
-            # Send alert for failures
-            await send_alert(
-                name="AgentProcessingError",
-                severity=AlertSeverity.WARNING,
-                message=f"Agent {self.agent_name} processing failed: {str(e)}",
-                service=f"agent_{self.agent_name}",
-                labels={"error_type": type(e).__name__}
-            )
-            
-            # Add tracing error
-            if self.tracing:
-                self.tracing.record_exception(e)
-            
-            logger.error(f"❌ Agent {self.agent_name} processing failed: {e}")
-            
-            return {
-                "agent": self.agent_name,
-                "query": query,
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat(),
-                "processing_time": (datetime.utcnow() - start_time).total_seconds(),
-                "success": False
-            }
-    
-    async def _process_with_agent(self, query: str, context: Dict[str, Any] = None):
-        """Process query with the specific agent"""
-        try:
-            # Handle different agent interfaces
-            if hasattr(self.agent, 'process_query'):
-                return await self.agent.process_query(query, context)
-            elif hasattr(self.agent, 'process'):
-                return await self.agent.process(query, context)
-            elif hasattr(self.agent, 'ask'):
-                return await self.agent.ask(query, context)
-            elif hasattr(self.agent, 'generate'):
-                return await self.agent.generate(query, context)
-            elif callable(self.agent):
-                return await self.agent(query, context)
-            else:
-                # Try common method names
-                for method_name in ['handle', 'execute', 'run']:
-                    if hasattr(self.agent, method_name):
-                        method = getattr(self.agent, method_name)
-                        if callable(method):
-                            return await method(query, context)
                 
-                raise Exception(f"No suitable processing method found for agent {self.agent_name}")
+            except AuthError as e:
+                # Already alerted as UnauthorizedAgentAccess before raising; not a
+                # processing failure, so keep it out of the span error and metric
+                obs.discard()
+                err_str = str(e)
+                logger.warning(f"⚠️ Agent {self.agent_name} rejected query: {err_str}")
+                return self._error_result(query, err_str, obs)
                 
-        except Exception as e:
-            logger.error(f"Error processing with agent {self.agent_name}: {e}")
-            raise
+            except Exception as e:
+                # Marks the span errored and the metric as a failure
+                obs.fail(e)
+                err_str = str(e)
+                
+                # Send alert for failures
+                _alert_in_background(
+                    name="AgentProcessingError",
+                    severity=AlertSeverity.WARNING,
+                    message=f"Agent {self.agent_name} processing failed: {err_str}",
+                    service=self._service,
+                    labels={"error_type": type(e).__name__}
+                )
+                
+                logger.error(f"❌ Agent {self.agent_name} processing failed: {err_str}")
+                return self._error_result(query, err_str, obs)
+    
+    def _error_result(self, query: str, err_str: str, obs) -> Dict[str, Any]:
+        return {
+            "agent": self.agent_name,
+            "query": query,
+            "error": err_str,
+            "timestamp": datetime.utcnow().isoformat(),
+            "processing_time": obs.elapsed(),
+            "success": False
+        }
+
+def _format_timestamp(ts: Optional[float]) -> Optional[str]:
+    """Render a stored epoch timestamp as ISO-8601 (UTC)"""
+    return datetime.utcfromtimestamp(ts).isoformat() if ts is not None else None
+
+@dataclass(slots=True)
+class AgentStats:
+    """Per-agent usage counters"""
+    description: str
+    total_queries: int = 0
+    successful_queries: int = 0
+    failed_queries: int = 0
+    average_response_time: float = 0.0
+    last_used: Optional[float] = None
+    
+    def record(self, success: bool, duration: float, now: float):
+        """Apply one query's outcome in a single, await-free update"""
+        # Plain slot arithmetic on locals; a JIT kernel's per-call dispatch
+        # would cost more than this whole update
+        n = self.total_queries + 1
+        avg = self.average_response_time
+        self.total_queries = n
+        if success:
+            self.successful_queries += 1
+        else:
+            self.failed_queries += 1
+        # Incremental mean
+        self.average_response_time = avg + (duration - avg) / n
+        self.last_used = now
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Stats with the last-used timestamp rendered for output"""
+        return {
+            "description": self.description,
+            "total_queries": self.total_queries,
+            "successful_queries": self.successful_queries,
+            "failed_queries": self.failed_queries,
+            "average_response_time": self.average_response_time,
+            "last_used": _format_timestamp(self.last_used)
+        }
 
 class BHIVAgentRegistry:
     """Enhanced agent registry with security and observability"""
     
     def __init__(self):
         self.agents: Dict[str, EnhancedAgentWrapper] = {}
-        self.agent_stats: Dict[str, Dict] = {}
+        self.agent_stats: Dict[str, AgentStats] = {}
+        self._last_health: Dict[bool, tuple] = {}
+        
+        # Response cache for idempotent, read-only agents
+        self._resp_cache = TTLCache(maxsize=RESPONSE_CACHE_MAX_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._cacheable = CACHEABLE_AGENTS
         
     async def initialize(self):
         """Initialize all agents with enhancements"""
         logger.info("🤖 Initializing BHIV Agent Registry...")
+        _start_event_workers()
         
-        # Define agents to initialize
-        agent_configs = [
-            {"class": VedasAgent, "name": "vedas", "description": "Spiritual guidance and Vedic wisdom"},
-            {"class": EduMentorAgent, "name": "edumentor", "description": "Educational content and learning support"},
-            {"class": WellnessAgent, "name": "wellness", "description": "Mental health and wellness guidance"},
-            {"class": KnowledgeAgent, "name": "knowledge", "description": "Knowledge retrieval and analysis"},
-            {"class": ImageAgent, "name": "image", "description": "Image analysis and description"},
-            {"class": AudioAgent, "name": "audio", "description": "Audio processing and transcription"},
-            {"class": TextAgent, "name": "text", "description": "Text processing and analysis"},
-            {"class": QnAAgent, "name": "qna", "description": "Question and answer processing"},
-            {"class": SummarizerAgent, "name": "summarizer", "description": "Content summarization"},
-            {"class": PlannerAgent, "name": "planner", "description": "Task planning and organization"},
-            {"class": FileSearchAgent, "name": "file_search", "description": "File search and retrieval"},
-            {"class": AgentOrchestrator, "name": "orchestrator", "description": "Agent coordination and routing"}
-        ]
+        # Initialize all agents concurrently; startup takes as long as the slowest one
+        results = await asyncio.gather(
+            *(self._init_agent(config) for config in AGENT_CONFIGS),
+            return_exceptions=True
+        )
         
-        # Initialize each agent
-        for config in agent_configs:
-            try:
-                # Create agent instance
-                agent_instance = config["class"]()
-                
-                # Initialize if method exists
-                if hasattr(agent_instance, 'initialize'):
-                    await agent_instance.initialize()
-                
-                # Wrap with enhancements
-                enhanced_agent = EnhancedAgentWrapper(agent_instance, config["name"])
-                self.agents[config["name"]] = enhanced_agent
-                
-                # Initialize stats
-                self.agent_stats[config["name"]] = {
-                    "description": config["description"],
-                    "total_queries": 0,
-                    "successful_queries": 0,
-                    "failed_queries": 0,
-                    "average_response_time": 0.0,
-                    "last_used": None
-                }
-                
-                logger.info(f"✅ {config['name']} agent initialized")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize {config['name']} agent: {e}")
+        for config, result in zip(AGENT_CONFIGS, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Failed to initialize {config.name} agent: {result}")
                 
                 # Send alert for initialization failure
-                await send_alert(
+                _alert_in_background(
                     name="AgentInitializationFailed",
                     severity=AlertSeverity.CRITICAL,
-                    message=f"Failed to initialize {config['name']} agent: {str(e)}",
+                    message=f"Failed to initialize {config.name} agent: {str(result)}",
                     service="agent_registry"
                 )
+                continue
+            
+            self.agents[config.name] = result
+            
+            # Initialize stats
+            self.agent_stats[config.name] = AgentStats(description=config.description)
+            
+            logger.info(f"✅ {config.name} agent initialized")
         
         logger.info(f"✅ Agent registry initialized with {len(self.agents)} agents")
+        
+        await self.warmup()
+    
+    async def warmup(self):
+        """Exercise every agent once so lazy model/JIT setup happens before real traffic
+        
+        Agents exposing a ``warmup_prompt`` attribute get one full query with it;
+        the rest are pinged. Any ``@njit`` code in downstream agents should use
+        ``cache=True`` so compiled kernels persist across restarts.
+        """
+        async def _warm(wrapper: EnhancedAgentWrapper):
+            prompt = getattr(wrapper.agent, 'warmup_prompt', None)
+            if prompt:
+                return await wrapper.process_query(prompt, {"warmup": True})
+            return await wrapper.ping()
+        
+        names = list(self.agents)
+        results = await asyncio.gather(
+            *(_warm(agent) for agent in self.agents.values()),
+            return_exceptions=True
+        )
+        
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Warmup failed for {name} agent: {result}")
+            elif not result.get("success", False):
+                logger.warning(f"⚠️ Warmup failed for {name} agent: {result.get('error', 'unhealthy')}")
+        
+        logger.info("✅ Agent warmup complete")
+    
+    async def _init_agent(self, config: AgentConfig) -> EnhancedAgentWrapper:
+        """Create, initialize and wrap a single agent"""
+        # Constructors may load models, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        agent_instance = await loop.run_in_executor(None, config.cls)
+        
+        # Initialize if method exists
+        if hasattr(agent_instance, 'initialize'):
+            await agent_instance.initialize()
+        
+        # Wrap with enhancements
+        return EnhancedAgentWrapper(agent_instance, config.name)
     
     async def process_query(self, agent_name: str, query: str, context: Dict[str, Any] = None, user_token: str = None):
         """Process query with specified agent"""
         if agent_name not in self.agents:
             raise Exception(f"Agent '{agent_name}' not found")
         
-        # Update stats
-        self.agent_stats[agent_name]["total_queries"] += 1
-        self.agent_stats[agent_name]["last_used"] = datetime.utcnow().isoformat()
+        # Serve repeated read-only queries from the response cache. Authenticated
+        # calls bypass it so token checks always run.
+        cache_key = None
+        if agent_name in self._cacheable and not user_token:
+            cache_key = (agent_name, _digest(query), _context_digest(context))
+            cached = self._resp_cache.get(cache_key)
+            if cached is not None:
+                self.agent_stats[agent_name].record(True, 0.0, time.time())
+                return {**cached, "cached": True}
         
         # Process with agent
         result = await self.agents[agent_name].process_query(query, context, user_token)
         
-        # Update success/failure stats
-        if result.get("success", False):
-            self.agent_stats[agent_name]["successful_queries"] += 1
-        else:
-            self.agent_stats[agent_name]["failed_queries"] += 1
-        
-        # Update average response time
-        processing_time = result.get("processing_time", 0)
-        current_avg = self.agent_stats[agent_name]["average_response_time"]
-        total_queries = self.agent_stats[agent_name]["total_queries"]
-        
-        self.agent_stats[agent_name]["average_response_time"] = (
-            (current_avg * (total_queries - 1) + processing_time) / total_queries
+        # Update stats in one step so concurrent queries cannot interleave
+        self.agent_stats[agent_name].record(
+            result.get("success", False),
+            result.get("processing_time", 0.0),
+            time.time()
         )
         
+        if cache_key is not None and result.get("success", False):
+            self._resp_cache[cache_key] = result
+        
         return result
     
-    def get_agent_list(self) -> List[Dict[str, Any]]:
-        """Get list of available agents"""
-        return [
-            {
+    def invalidate(self, agent_name: str, query: Optional[str] = None):
+        """Drop cached responses for an agent, optionally only for one query"""
+        query_digest = _digest(query) if query is not None else None
+        for key in list(self._resp_cache.keys()):
+            if key[0] == agent_name and (query_digest is None or key[1] == query_digest):
+                self._resp_cache.pop(key, None)
+    
+    def iter_agents(self) -> Iterator[Dict[str, Any]]:
+        """Yield available agents with their stats, built on demand"""
+        for name, stats in self.agent_stats.items():
+            total = stats.total_queries
+            yield {
                 "name": name,
-                "description": stats["description"],
+                "description": stats.description,
                 "stats": {
-                    "total_queries": stats["total_queries"],
-                    "success_rate": (
-                        stats["successful_queries"] / stats["total_queries"] 
-                        if stats["total_queries"] > 0 else 0
-                    ),
-                    "average_response_time": stats["average_response_time"],
-                    "last_used": stats["last_used"]
+                    "total_queries": total,
+                    "success_rate": stats.successful_queries / total if total > 0 else 0,
+                    "average_response_time": stats.average_response_time,
+                    "last_used": _format_timestamp(stats.last_used)
                 }
             }
-            for name, stats in self.agent_stats.items()
-        ]
+    
+    def get_agent_list(self) -> List[Dict[str, Any]]:
+        """Get list of available agents"""
+        return list(self.iter_agents())
     
     def get_agent_stats(self, agent_name: str = None) -> Dict[str, Any]:
         """Get agent statistics"""
         if agent_name:
-            return self.agent_stats.get(agent_name, {})
-        return self.agent_stats
+            stats = self.agent_stats.get(agent_name)
+            return stats.to_dict() if stats else {}
+        return {name: stats.to_dict() for name, stats in self.agent_stats.items()}
     
-    async def health_check(self) -> Dict[str, Any]:
-        """Health check for all agents"""
+    async def health_check(self, deep: bool = False) -> Dict[str, Any]:
+        """Health check for all agents
+        
+        By default agents are only pinged; ``deep=True`` runs a full query
+        through each agent (model call, audit log, metrics).
+        """
+        # Rapid repeated probes reuse the last result
+        now = time.monotonic()
+        cached = self._last_health.get(deep)
+        if cached is not None and now - cached[0] < HEALTH_CHECK_MIN_INTERVAL:
+            return cached[1]
+        
         health_status = {
             "status": "healthy",
             "total_agents": len(self.agents),
             "agents": {}
         }
         
-        for name, agent in self.agents.items():
-            try:
-                # Basic health check - try to process a simple query
-                test_result = await agent.process_query("health check", {"test": True})
-                
+        # Probe all agents concurrently, each bounded by its own timeout
+        names = list(self.agents)
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    agent.process_query("health check", {"test": True}) if deep else agent.ping(),
+                    timeout=HEALTH_CHECK_TIMEOUT
+                )
+                for agent in self.agents.values()
+            ),
+            return_exceptions=True
+        )
+        
+        for name, test_result in zip(names, results):
+            if isinstance(test_result, asyncio.TimeoutError):
                 health_status["agents"][name] = {
-                    "status": "healthy" if test_result.get("success", False) else "unhealthy",
-                    "last_response_time": test_result.get("processing_time", 0),
-                    "stats": self.agent_stats[name]
+                    "status": "unhealthy",
+                    "error": f"Health check timed out after {HEALTH_CHECK_TIMEOUT}s",
+                    "stats": self.agent_stats[name].to_dict()
                 }
-                
-            except Exception as e:
+            elif isinstance(test_result, Exception):
                 health_status["agents"][name] = {
                     "status": "unhealthy",
-                    "error": str(e),
-                    "stats": self.agent_stats[name]
+                    "error": str(test_result),
+                    "stats": self.agent_stats[name].to_dict()
+                }
+            else:
+                health_status["agents"][name] = {
+                    "status": "healthy" if test_result.get("success", False) else "unhealthy",
+                    "last_response_time": test_result.get("processing_time", 0),
+                    "stats": self.agent_stats[name].to_dict()
                 }
         
         # Overall health
@@ -334,17 +614,20 @@ class BHIVAgentRegistry:
             health_status["status"] = "degraded"
             health_status["unhealthy_agents"] = unhealthy_agents
         
+        health_status["dropped_events"] = get_dropped_event_counts()
+        
+        self._last_health[deep] = (time.monotonic(), health_status)
         return health_status
+    
+    async def shutdown(self):
+        """Flush pending background audit/alert work"""
+        await drain_background()
 
-# Global agent registry
-_agent_registry: Optional[BHIVAgentRegistry] = None
-
+# Global agent registry (created lazily on first call)
+@functools.cache
 def get_agent_registry() -> BHIVAgentRegistry:
     """Get or create agent registry"""
-    global _agent_registry
-    if _agent_registry is None:
-        _agent_registry = BHIVAgentRegistry()
-    return _agent_registry
+    return BHIVAgentRegistry()
 
 async def main():
     """Test agent integration"""
@@ -384,13 +667,15 @@ async def main():
         
         # Get agent stats
         stats = registry.get_agent_stats()
-        logger.info(f"Agent stats: {json.dumps(stats, indent=2)}")
+        logger.info(f"Agent stats: {_dumps(stats)}")
         
         logger.info("🎉 Agent integration test completed!")
         
     except Exception as e:
         logger.error(f"❌ Agent integration test failed: {e}")
         raise
+    finally:
+        await registry.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
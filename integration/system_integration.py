@@ -15,9 +15,17 @@ import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
+import httpx
+import uvicorn
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -27,7 +35,7 @@ from modules.shared.base_service import BaseService, ServiceRegistry
 from observability.metrics import get_metrics, monitor_function
 from observability.tracing import get_tracing, trace_business_operation
 from observability.alerting import get_alert_manager, send_alert, AlertSeverity
-from security.auth import create_access_token, verify_token
+from security.auth import create_access_token, verify_token_cached
 from security.rbac import check_permission, Permission
 from agents.threat_detection import ThreatDetectionAgent
 from agents.threat_response import ThreatResponseAgent
@@ -38,13 +46,42 @@ from agents.agent_orchestrator import AgentOrchestrator
 
 logger = logging.getLogger(__name__)
 
+# Microservices as (name, port)
+_MICROSERVICES: Tuple[Tuple[str, int], ...] = (
+    ("logistics", 8001),
+    ("crm", 8002),
+    ("agent_orchestration", 8003),
+    ("llm_query", 8004),
+    ("integrations", 8005),
+    ("api_gateway", 8000),
+)
+
+# Readiness probing for start_services
+SERVICE_READY_TIMEOUT = 30.0
+PROBE_INITIAL_DELAY = 0.05
+PROBE_MAX_DELAY = 1.0
+SERVICE_STOP_TIMEOUT = 10.0
+
+def enable_eager_tasks():
+    """Run new tasks eagerly on the current loop (Python 3.12+, no-op otherwise)"""
+    # Inert on the python:3.11 image this repo ships; takes effect once it moves to 3.12
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is None:
+        logger.info("Eager task factory unavailable (needs Python 3.12+); using the default")
+        return
+    asyncio.get_running_loop().set_task_factory(eager_task_factory)
+
 class BHIVCoreIntegration:
     """Main integration class for BHIV Core system"""
     
     def __init__(self):
         self.services: Dict[str, BaseService] = {}
         self.agents: Dict[str, Any] = {}
+        self._agent_factories: Dict[str, Any] = {}
+        self._agent_locks: Dict[str, asyncio.Lock] = {}
         self.service_registry = ServiceRegistry()
+        self._service_tasks: List[asyncio.Task] = []
+        self._servers: Dict[str, uvicorn.Server] = {}
         self.is_initialized = False
         
     async def initialize(self):
@@ -52,20 +89,15 @@ class BHIVCoreIntegration:
         try:
             logger.info("🚀 Initializing BHIV Core Integration...")
             
-            # Initialize security components
-            await self._init_security()
-            
-            # Initialize threat mitigation
-            await self._init_threat_mitigation()
-            
-            # Initialize microservices
-            await self._init_microservices()
-            
-            # Initialize agent system
-            await self._init_agent_system()
-            
-            # Initialize observability
-            await self._init_observability()
+            # Security, threat mitigation, microservices, agents and
+            # observability touch disjoint subsystems, so bring them up together
+            await asyncio.gather(
+                self._init_security(),
+                self._init_threat_mitigation(),
+                self._init_microservices(),
+                self._init_agent_system(),
+                self._init_observability()
+            )
             
             # Verify integration
             await self._verify_integration()
@@ -83,7 +115,7 @@ class BHIVCoreIntegration:
         
         # Test JWT token creation and verification
         test_token = create_access_token({"sub": "test_user", "role": "admin"})
-        payload = verify_token(test_token)
+        payload = verify_token_cached(test_token)
         
         if payload and payload.get("sub") == "test_user":
             logger.info("✅ JWT authentication working")
@@ -100,13 +132,13 @@ class BHIVCoreIntegration:
         """Initialize threat mitigation components"""
         logger.info("🛡️ Initializing threat mitigation...")
         
-        # Initialize threat detection agent
+        # Initialize threat detection and response agents
         self.threat_detection = ThreatDetectionAgent()
-        await self.threat_detection.initialize()
-        
-        # Initialize threat response agent
         self.threat_response = ThreatResponseAgent()
-        await self.threat_response.initialize()
+        await asyncio.gather(
+            self.threat_detection.initialize(),
+            self.threat_response.initialize()
+        )
         
         logger.info("✅ Threat mitigation initialized")
     
@@ -114,34 +146,26 @@ class BHIVCoreIntegration:
         """Initialize microservices"""
         logger.info("🏗️ Initializing microservices...")
         
-        # Define microservices configuration
-        microservices_config = [
-            {"name": "logistics", "port": 8001},
-            {"name": "crm", "port": 8002},
-            {"name": "agent_orchestration", "port": 8003},
-            {"name": "llm_query", "port": 8004},
-            {"name": "integrations", "port": 8005},
-            {"name": "api_gateway", "port": 8000}
-        ]
-        
-        # Initialize each microservice
-        for config in microservices_config:
-            service = BaseService(
-                service_name=config["name"],
-                port=config["port"],
+        # Build the services off the event loop; each sets up its own FastAPI app
+        services = await asyncio.gather(*(
+            asyncio.to_thread(
+                BaseService,
+                service_name=name,
+                port=port,
                 enable_security=True,
                 enable_threat_protection=True,
                 enable_observability=True
             )
-            
-            self.services[config["name"]] = service
-            
-            # Register service in registry
-            self.service_registry.register_service(
-                name=config["name"],
-                host="localhost",
-                port=config["port"]
-            )
+            for name, port in _MICROSERVICES
+        ))
+        
+        for service in services:
+            self.services[service.service_name] = service
+        
+        # Register services in registry
+        self.service_registry.register_services(
+            [(name, "localhost", port) for name, port in _MICROSERVICES]
+        )
         
         logger.info("✅ Microservices initialized")
     
@@ -149,22 +173,37 @@ class BHIVCoreIntegration:
         """Initialize agent system"""
         logger.info("🤖 Initializing agent system...")
         
-        # Initialize specialized agents
-        self.agents = {
-            "vedas": VedasAgent(),
-            "edumentor": EduMentorAgent(),
-            "wellness": WellnessAgent(),
-            "orchestrator": AgentOrchestrator()
+        # Register specialized agents; each is built on first use by get_agent()
+        self._agent_factories = {
+            "vedas": VedasAgent,
+            "edumentor": EduMentorAgent,
+            "wellness": WellnessAgent,
+            "orchestrator": AgentOrchestrator
         }
-        
-        # Initialize each agent
-        for name, agent in self.agents.items():
-            if hasattr(agent, 'initialize'):
-                await agent.initialize()
-            logger.info(f"✅ {name.title()} agent initialized")
+        self._agent_locks = {name: asyncio.Lock() for name in self._agent_factories}
         
         logger.info("✅ Agent system initialized")
     
+    async def get_agent(self, name: str) -> Any:
+        """Get a specialized agent, constructing and initializing it on first use"""
+        agent = self.agents.get(name)
+        if agent is not None:
+            return agent
+        
+        if name not in self._agent_factories:
+            raise KeyError(f"Unknown agent: {name}")
+        
+        async with self._agent_locks[name]:
+            agent = self.agents.get(name)
+            if agent is None:
+                agent = self._agent_factories[name]()
+                if hasattr(agent, 'initialize'):
+                    await agent.initialize()
+                self.agents[name] = agent
+                logger.info(f"✅ {name.title()} agent initialized")
+        
+        return agent
+    
     async def _init_observability(self):
         """Initialize observability components"""
         logger.info("📊 Initializing observability...")
@@ -190,11 +229,13 @@ class BHIVCoreIntegration:
         """Verify all components are working together"""
         logger.info("🔍 Verifying system integration...")
         
-        # Test end-to-end flow
-        await self._test_security_flow()
-        await self._test_agent_flow()
-        await self._test_threat_detection_flow()
-        await self._test_observability_flow()
+        # Test end-to-end flows
+        await asyncio.gather(
+            self._test_security_flow(),
+            self._test_agent_flow(),
+            self._test_threat_detection_flow(),
+            self._test_observability_flow()
+        )
         
         logger.info("✅ System integration verified")
     
@@ -205,7 +246,7 @@ class BHIVCoreIntegration:
         token = create_access_token({"sub": "test_user", "role": "admin"})
         
         # Verify token
-        payload = verify_token(token)
+        payload = verify_token_cached(token)
         assert payload["sub"] == "test_user"
         
         # Test RBAC
@@ -218,16 +259,18 @@ class BHIVCoreIntegration:
     async def _test_agent_flow(self):
         """Test agent system integration"""
         # Test Vedas agent
-        if "vedas" in self.agents:
-            vedas_response = await self.agents["vedas"].process_query(
+        if "vedas" in self._agent_factories:
+            vedas_agent = await self.get_agent("vedas")
+            vedas_response = await vedas_agent.process_query(
                 "What is dharma?",
                 context={"user_id": "test_user"}
             )
             assert vedas_response is not None
         
         # Test EduMentor agent
-        if "edumentor" in self.agents:
-            edu_response = await self.agents["edumentor"].process_query(
+        if "edumentor" in self._agent_factories:
+            edu_agent = await self.get_agent("edumentor")
+            edu_response = await edu_agent.process_query(
                 "Explain machine learning",
                 context={"user_id": "test_user"}
             )
@@ -282,7 +325,7 @@ class BHIVCoreIntegration:
         
         logger.info("🚀 Starting all BHIV Core services...")
         
-        # Start services in dependency order
+        # Services in dependency order
         service_order = [
             "integrations",
             "llm_query", 
@@ -292,23 +335,63 @@ class BHIVCoreIntegration:
             "api_gateway"
         ]
         
-        for service_name in service_order:
-            if service_name in self.services:
-                service = self.services[service_name]
-                logger.info(f"Starting {service_name} service on port {service.port}")
-                
-                # Start service in background
-                asyncio.create_task(self._start_service(service))
-                
-                # Wait a bit between service starts
-                await asyncio.sleep(2)
-        
-        logger.info("✅ All services started successfully!")
+        ordered_services = [
+            self.services[name] for name in service_order if name in self.services
+        ]
+        
+        # Launch every service at once, then wait for each to report healthy
+        for service in ordered_services:
+            logger.info(f"Starting {service.service_name} service on port {service.port}")
+            self._service_tasks.append(asyncio.create_task(self._start_service(service)))
+        
+        async with httpx.AsyncClient() as client:
+            ready = await asyncio.gather(*(
+                self._wait_until_healthy(client, service) for service in ordered_services
+            ))
+        
+        if all(ready):
+            logger.info("✅ All services started successfully!")
+        else:
+            not_ready = [s.service_name for s, ok in zip(ordered_services, ready) if not ok]
+            logger.warning(f"⚠️ Services not ready after {SERVICE_READY_TIMEOUT}s: {not_ready}")
+    
+    async def _wait_until_healthy(self, client: httpx.AsyncClient, service: BaseService,
+                                  timeout: float = SERVICE_READY_TIMEOUT) -> bool:
+        """Probe a service's health endpoint with exponential backoff until it responds"""
+        info = self.service_registry.get_service(service.service_name)
+        url = f"{info['url']}{info['health_endpoint']}" if info else f"http://localhost:{service.port}/health"
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = PROBE_INITIAL_DELAY
+        
+        while loop.time() < deadline:
+            try:
+                response = await client.get(url, timeout=PROBE_MAX_DELAY)
+                if response.status_code == 200:
+                    if info:
+                        info["status"] = "healthy"
+                    logger.info(f"✅ {service.service_name} service ready")
+                    return True
+            except httpx.HTTPError:
+                pass
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PROBE_MAX_DELAY)
+        
+        if info:
+            info["status"] = "unhealthy"
+        return False
     
     async def _start_service(self, service: BaseService):
         """Start a single service"""
         try:
-            service.run(host="0.0.0.0", debug=False)
+            # Serve on this loop (not a worker thread) so shutdown can stop it
+            server = uvicorn.Server(uvicorn.Config(
+                service.app, host="0.0.0.0", port=service.port, log_level="info"
+            ))
+            self._servers[service.service_name] = server
+            await server.serve()
         except Exception as e:
             logger.error(f"❌ Failed to start service {service.service_name}: {e}")
     
@@ -327,11 +410,12 @@ class BHIVCoreIntegration:
                 "port": service.port
             }
         
-        # Check agents
-        for name, agent in self.agents.items():
+        # Check agents (not yet used agents have not been loaded)
+        for name, factory in self._agent_factories.items():
+            agent = self.agents.get(name)
             health_status["components"][f"agent_{name}"] = {
-                "status": "healthy",
-                "type": type(agent).__name__
+                "status": "healthy" if agent is not None else "not_loaded",
+                "type": factory.__name__
             }
         
         # Check observability
@@ -347,16 +431,25 @@ class BHIVCoreIntegration:
         """Graceful shutdown of all components"""
         logger.info("🛑 Shutting down BHIV Core system...")
         
-        # Shutdown services
-        for name, service in self.services.items():
-            if hasattr(service, 'shutdown'):
-                await service.shutdown()
+        # Ask the uvicorn servers to exit and wait for them to close their sockets
+        for server in self._servers.values():
+            server.should_exit = True
+        if self._service_tasks:
+            _, pending = await asyncio.wait(self._service_tasks, timeout=SERVICE_STOP_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            self._service_tasks.clear()
+        self._servers.clear()
+        
+        # Shutdown services and agents concurrently
+        await asyncio.gather(*(
+            component.shutdown()
+            for component in (*self.services.values(), *self.agents.values())
+            if hasattr(component, 'shutdown')
+        ))
+        for name in self.services:
             logger.info(f"✅ {name} service shutdown")
-        
-        # Shutdown agents
-        for name, agent in self.agents.items():
-            if hasattr(agent, 'shutdown'):
-                await agent.shutdown()
+        for name in self.agents:
             logger.info(f"✅ {name} agent shutdown")
         
         logger.info("✅ BHIV Core system shutdown complete")
@@ -377,6 +470,7 @@ async def main():
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
+    enable_eager_tasks()
     
     integration = get_bhiv_integration()
     
@@ -400,4 +494,6 @@ async def main():
         await integration.shutdown()
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
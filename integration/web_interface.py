@@ -6,8 +6,13 @@ Web Interface for BHIV Core - Bootstrap UI with real-time results and authentica
 import os
 import sys
 import json
+import time
+import hashlib
+import shutil
+import tempfile
 import uuid
 import asyncio
+import functools
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
@@ -16,12 +21,27 @@ from typing import Dict, Any, Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI, Request, Form, File, UploadFile, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from passlib.context import CryptContext
-import requests
+from cachetools import TTLCache
+import aiofiles
+import httpx
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import httptools
+except ImportError:
+    httptools = None
 
 # Simple logger setup
 logging.basicConfig(level=logging.INFO)
@@ -51,7 +71,7 @@ except ImportError:
     }
 
 # Initialize FastAPI app
-app = FastAPI(title="BHIV Core Web Interface", version="1.0.0")
+app = FastAPI(title="BHIV Core Web Interface", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Security setup
 security = HTTPBasic()
@@ -63,40 +83,152 @@ USERS_DB = {
     "user": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW"   # secret
 }
 
+# Hash checked for unknown usernames so they cost the same as known ones
+_DUMMY_HASH = pwd_context.hash("not-a-real-password")
+
 # Templates and static files
 templates = Jinja2Templates(directory="templates")
 os.makedirs("static", exist_ok=True)
 os.makedirs("templates", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# MongoDB client
-mongo_client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_CONFIG['uri'])
+# MongoDB client (one pooled client shared by all handlers)
+mongo_client = motor.motor_asyncio.AsyncIOMotorClient(
+    MONGO_CONFIG['uri'],
+    maxPoolSize=50,
+    minPoolSize=5,
+    serverSelectionTimeoutMS=2000
+)
 mongo_db = mongo_client[MONGO_CONFIG['database']]
 
-# Task storage for real-time updates
-active_tasks = {}
+# Task storage for real-time updates, shared across workers and expired by Redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+TASK_TTL = 3600
+DASHBOARD_CACHE_TTL = 10
+redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+
+# Per-worker fallback while Redis is unreachable, so task pages keep working
+# (status polls only see tasks from the same worker until Redis is back)
+_local_tasks = TTLCache(maxsize=10_000, ttl=TASK_TTL)
+
+async def save_task(task_id: str, task_info: Dict[str, Any]):
+    """Store task state for status polling."""
+    raw = json.dumps(task_info, default=str)
+    try:
+        await redis_client.set(f"task:{task_id}", raw, ex=TASK_TTL)
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, keeping task {task_id} in process: {str(e)}")
+        _local_tasks[task_id] = raw
+
+async def load_task(task_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch task state, or None if unknown or expired."""
+    try:
+        raw = await redis_client.get(f"task:{task_id}")
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, reading task {task_id} from process: {str(e)}")
+        raw = None
+    if raw is None:
+        raw = _local_tasks.get(task_id)
+    return json.loads(raw) if raw else None
+
+async def cached_query(key: str, query):
+    """Return a cached query result, running ``query()`` on a miss."""
+    try:
+        raw = await redis_client.get(key)
+    except RedisError:
+        # No cache without Redis; serve straight from the query
+        return await query()
+    if raw:
+        return json.loads(raw)
+    
+    result = await query()
+    try:
+        await redis_client.set(key, json.dumps(result, default=str), ex=DASHBOARD_CACHE_TTL)
+    except RedisError:
+        pass
+    return result
+
+# Per-task upload directories are created under this base
+UPLOAD_TEMP_DIR = os.getenv("UPLOAD_TEMP_DIR", "temp")
+
+# Chunk size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# MCP bridge
+MCP_BRIDGE_URL = "http://localhost:8002"
+
+# Pooled async HTTP client for MCP bridge calls
+http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(TIMEOUT_CONFIG.get('file_upload_timeout', 300)),
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+)
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Close the pooled HTTP and Redis clients."""
+    await http_client.aclose()
+    await redis_client.aclose()
+
+@app.on_event("startup")
+async def create_directories():
+    """Create the upload temp directory once instead of per request."""
+    os.makedirs(UPLOAD_TEMP_DIR, exist_ok=True)
+
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the indexes behind the dashboard queries."""
+    try:
+        await mongo_db.task_logs.create_index([("timestamp", -1)])
+        await mongo_db.nlo_collection.create_index([("subject_tag", 1), ("timestamp", -1)])
+    except Exception as e:
+        logger.warning(f"Could not create MongoDB indexes: {str(e)}")
+
+@app.on_event("startup")
+async def enable_eager_tasks():
+    """Run new tasks eagerly on the server loop (Python 3.12+, no-op otherwise)."""
+    # Inert on the python:3.11 image this repo ships; takes effect once it moves to 3.12
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is None:
+        logger.info("Eager task factory unavailable (needs Python 3.12+); using the default")
+        return
+    asyncio.get_running_loop().set_task_factory(eager_task_factory)
+
+# Recently verified credentials, so repeat requests skip bcrypt
+AUTH_CACHE_MAX_SIZE = 1024
+AUTH_CACHE_TTL = 300
+_verified_credentials = TTLCache(maxsize=AUTH_CACHE_MAX_SIZE, ttl=AUTH_CACHE_TTL)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_current_user(credentials: HTTPBasicCredentials = Depends(security)):
+async def get_current_user(credentials: HTTPBasicCredentials = Depends(security)):
     """Authenticate user."""
     username = credentials.username
-    if username not in USERS_DB:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Basic"},
-        )
+    known_user = username in USERS_DB
+    
+    # Unknown users are checked against a dummy hash so they take as long as known ones
+    hashed_password = USERS_DB[username] if known_user else _DUMMY_HASH
+    cache_key = (
+        username,
+        hashlib.sha256(credentials.password.encode()).digest(),
+        hashed_password
+    )
+    if known_user and cache_key in _verified_credentials:
+        return username
     
-    if not verify_password(credentials.password, USERS_DB[username]):
+    # bcrypt is deliberately slow, keep it off the event loop
+    verified = await asyncio.get_running_loop().run_in_executor(
+        None, verify_password, credentials.password, hashed_password
+    )
+    if not (known_user and verified):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Basic"},
         )
     
+    _verified_credentials[cache_key] = True
     return username
 
 @app.get("/", response_class=HTMLResponse)
@@ -112,18 +244,41 @@ async def home(request: Request, current_user: str = Depends(get_current_user)):
 async def dashboard(request: Request, current_user: str = Depends(get_current_user)):
     """Dashboard with recent tasks and analytics."""
     # Get recent tasks from MongoDB
-    recent_tasks = await mongo_db.task_logs.find().sort("timestamp", -1).limit(10).to_list(10)
+    recent_tasks = await cached_query(
+        "dashboard:recent_tasks",
+        lambda: mongo_db.task_logs.aggregate([
+            {"$sort": {"timestamp": -1}},
+            {"$limit": 10},
+            # Only the fields the dashboard renders; output is reduced to its error flag
+            {"$project": {
+                "_id": 0,
+                "task_id": 1,
+                "agent": 1,
+                "input_type": 1,
+                "timestamp": 1,
+                "output": {"$cond": [
+                    {"$ifNull": ["$output", False]},
+                    {"error": "$output.error", "present": True},
+                    "$$REMOVE"
+                ]}
+            }}
+        ]).to_list(10)
+    )
     
     # Get NLO statistics
-    nlo_stats = await mongo_db.nlo_collection.aggregate([
-        {"$group": {
-            "_id": "$subject_tag",
-            "count": {"$sum": 1},
-            "avg_confidence": {"$avg": "$confidence"}
-        }},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ]).to_list(10)
+    nlo_stats = await cached_query(
+        "dashboard:nlo_stats",
+        lambda: mongo_db.nlo_collection.aggregate([
+            {"$project": {"_id": 0, "subject_tag": 1, "confidence": 1}},
+            {"$group": {
+                "_id": "$subject_tag",
+                "count": {"$sum": 1},
+                "avg_confidence": {"$avg": "$confidence"}
+            }},
+            {"$sort": {"count": -1}},
+            {"$limit": 10}
+        ], allowDiskUse=False).to_list(10)
+    )
     
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
@@ -133,6 +288,43 @@ async def dashboard(request: Request, current_user: str = Depends(get_current_us
         "title": "Dashboard - BHIV Core"
     })
 
+# Content-type markers checked in priority order
+_INPUT_TYPE_MARKERS = (("pdf", "pdf"), ("image", "image"), ("audio", "audio"))
+
+@functools.lru_cache(maxsize=256)
+def classify_content_type(content_type: str) -> str:
+    """Map an upload content type to an MCP input type."""
+    return next((input_type for marker, input_type in _INPUT_TYPE_MARKERS if marker in content_type), "text")
+
+async def process_file(temp_file: Dict[str, Any], agent: str, task_description: str) -> Dict[str, Any]:
+    """Send a single uploaded file to the MCP bridge."""
+    input_type = classify_content_type(temp_file["content_type"] or "")
+    
+    # Call MCP bridge API
+    try:
+        response = await http_client.post(
+            f"{MCP_BRIDGE_URL}/handle_task",
+            json={
+                "agent": agent,
+                "input": task_description,
+                "pdf_path": temp_file["path"],
+                "input_type": input_type
+            }
+        )
+        response.raise_for_status()
+        return {
+            "filename": temp_file["filename"],
+            "result": response.json(),
+            "input_type": input_type
+        }
+    except Exception as e:
+        logger.error(f"Error processing {temp_file['filename']}: {str(e)}")
+        return {
+            "filename": temp_file["filename"],
+            "error": str(e),
+            "input_type": input_type
+        }
+
 @app.post("/upload")
 async def upload_files(
     request: Request,
@@ -143,126 +335,89 @@ async def upload_files(
 ):
     """Handle file uploads and process them."""
     task_id = str(uuid.uuid4())
+    tmp_dir = None
     
     try:
         # Store task info for real-time updates
-        active_tasks[task_id] = {
+        start_ns = time.monotonic_ns()
+        task_info = {
             "status": "processing",
             "files": [f.filename for f in files],
             "agent": agent,
             "user": current_user,
-            "start_time": datetime.now(),
+            "start_time": datetime.now().isoformat(),
             "description": task_description
         }
+        await save_task(task_id, task_info)
         
-        # Save uploaded files temporarily
+        # Save uploaded files temporarily in a directory private to this task
+        tmp_dir = tempfile.mkdtemp(prefix=f"{task_id}_", dir=UPLOAD_TEMP_DIR)
         temp_files = []
         for file in files:
-            temp_path = f"temp/{task_id}_{file.filename}"
-            os.makedirs("temp", exist_ok=True)
+            temp_path = os.path.join(tmp_dir, os.path.basename(file.filename or "upload"))
             
-            with open(temp_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
+            # Stream to disk in chunks instead of buffering the whole upload
+            size = 0
+            async with aiofiles.open(temp_path, "wb") as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+                    size += len(chunk)
             
             temp_files.append({
                 "path": temp_path,
                 "filename": file.filename,
                 "content_type": file.content_type,
-                "size": len(content)
+                "size": size
             })
         
-        # Process files based on type
-        results = []
-        for temp_file in temp_files:
-            # Determine input type from content type
-            content_type = temp_file["content_type"] or ""
-            if "pdf" in content_type:
-                input_type = "pdf"
-            elif "image" in content_type:
-                input_type = "image"
-            elif "audio" in content_type:
-                input_type = "audio"
-            else:
-                input_type = "text"
-            
-            # Call MCP bridge API
-            try:
-                response = requests.post(
-                    "http://localhost:8002/handle_task",
-                    json={
-                        "agent": agent,
-                        "input": task_description,
-                        "pdf_path": temp_file["path"],
-                        "input_type": input_type
-                    },
-                    timeout=TIMEOUT_CONFIG.get('file_upload_timeout', 300)
-                )
-                response.raise_for_status()
-                result = response.json()
-                results.append({
-                    "filename": temp_file["filename"],
-                    "result": result,
-                    "input_type": input_type
-                })
-            except Exception as e:
-                logger.error(f"Error processing {temp_file['filename']}: {str(e)}")
-                results.append({
-                    "filename": temp_file["filename"],
-                    "error": str(e),
-                    "input_type": input_type
-                })
+        # Process all files concurrently
+        results = await asyncio.gather(*(
+            process_file(temp_file, agent, task_description) for temp_file in temp_files
+        ))
         
         # Update task status
-        active_tasks[task_id].update({
+        # Durations come from the monotonic clock; wall-clock is only for display
+        task_info.update({
             "status": "completed",
             "results": results,
-            "end_time": datetime.now(),
-            "processing_time": (datetime.now() - active_tasks[task_id]["start_time"]).total_seconds()
+            "end_time": datetime.now().isoformat(),
+            "processing_time": (time.monotonic_ns() - start_ns) / 1e9
         })
+        await save_task(task_id, task_info)
         
-        # Clean up temp files
-        for temp_file in temp_files:
-            try:
-                os.remove(temp_file["path"])
-            except:
-                pass
-        
-        return JSONResponse({
+        return {
             "task_id": task_id,
             "status": "completed",
             "results": results,
-            "processing_time": active_tasks[task_id]["processing_time"]
-        })
+            "processing_time": task_info["processing_time"]
+        }
         
     except Exception as e:
         logger.error(f"Error in upload processing: {str(e)}")
-        active_tasks[task_id] = {
+        await save_task(task_id, {
             "status": "error",
             "error": str(e),
-            "end_time": datetime.now()
-        }
-        return JSONResponse({
+            "end_time": datetime.now().isoformat()
+        })
+        return ORJSONResponse({
             "task_id": task_id,
             "status": "error",
             "error": str(e)
         }, status_code=500)
+    
+    finally:
+        # Clean up temp files off the event loop
+        if tmp_dir:
+            await asyncio.to_thread(shutil.rmtree, tmp_dir, ignore_errors=True)
 
 @app.get("/task_status/{task_id}")
 async def get_task_status(task_id: str, current_user: str = Depends(get_current_user)):
     """Get real-time task status."""
-    if task_id not in active_tasks:
+    task_info = await load_task(task_id)
+    if task_info is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    task_info = active_tasks[task_id].copy()
-    
-    # Convert datetime objects to strings for JSON serialization
-    if "start_time" in task_info:
-        task_info["start_time"] = task_info["start_time"].isoformat()
-    if "end_time" in task_info:
-        task_info["end_time"] = task_info["end_time"].isoformat()
-    
-    return JSONResponse(task_info)
+    return task_info
 
 @app.get("/download_nlo/{task_id}")
 async def download_nlo(
@@ -283,25 +438,24 @@ async def download_nlo(
             del nlo["_id"]
         
         if format.lower() == "json":
-            # Create temporary JSON file
+            # Serve the serialized NLO straight from memory
             filename = f"nlo_{task_id}.json"
-            filepath = f"temp/{filename}"
-            os.makedirs("temp", exist_ok=True)
-            
-            with open(filepath, "w") as f:
-                json.dump(nlo, f, indent=2, default=str)
+            content = orjson.dumps(
+                nlo,
+                default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+            )
             
-            return FileResponse(
-                filepath,
+            return Response(
+                content,
                 media_type="application/json",
-                filename=filename,
                 headers={"Content-Disposition": f"attachment; filename={filename}"}
             )
         
         elif format.lower() == "pdf":
             # For PDF generation, you would need a PDF library like reportlab
             # For now, return JSON with PDF content-type
-            return JSONResponse(nlo, headers={
+            return ORJSONResponse(nlo, headers={
                 "Content-Type": "application/pdf",
                 "Content-Disposition": f"attachment; filename=nlo_{task_id}.pdf"
             })
@@ -333,7 +487,7 @@ async def get_nlos(
             if "_id" in nlo:
                 nlo["_id"] = str(nlo["_id"])
         
-        return JSONResponse(nlos)
+        return nlos
         
     except Exception as e:
         logger.error(f"Error getting NLOs: {str(e)}")
@@ -347,19 +501,19 @@ async def health_check():
         await mongo_client.admin.command('ping')
         
         # Check MCP bridge
-        response = requests.get("http://localhost:8002/health", timeout=5)
+        response = await http_client.get(f"{MCP_BRIDGE_URL}/health", timeout=5)
         mcp_status = response.status_code == 200
         
-        return JSONResponse({
+        return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "services": {
                 "mongodb": True,
                 "mcp_bridge": mcp_status
             }
-        })
+        }
     except Exception as e:
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "unhealthy",
             "error": str(e),
             "timestamp": datetime.now().isoformat()
@@ -367,4 +521,10 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8003)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8003,
+        loop="uvloop" if uvloop is not None else "asyncio",
+        http="httptools" if httptools is not None else "h11"
+    )
@@ -3,32 +3,309 @@ Gurukul Backend Integration for BHIV Knowledge Base
 Complete integration guide and implementation for Gurukul system
 """
 
-import requests
 import asyncio
+import time
 import aiohttp
+import requests
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 import json
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+from integrations.gurukul_bridge import (
+    SHARED_SESSION, _LOWER, _QUERY_KB_TMPL, _QUERY_USER_TMPL, get_circuit_breaker
+)
+
+DEFAULT_API_URL = "http://localhost:8001"
+
+# Shared aiohttp session settings; the session-wide timeout is only a backstop,
+# each request passes its own budget
+DEFAULT_TIMEOUT = 30
+CONNECT_TIMEOUT = 5
+SESSION_TIMEOUT = 60
+CONNECTOR_LIMIT = 100
+CONNECTOR_LIMIT_PER_HOST = 10
+DNS_CACHE_TTL = 30
+
+# Per-request timeouts: queries get the full budget, /health must fail fast
+QUERY_TIMEOUT = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT)
+HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=2, connect=1)
+
+# Response size guards: cap sources handed to Gurukul, refuse oversized bodies
+MAX_SOURCES = 20
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# (status, body) handed to callers when a reply is refused for its size
+_TOO_LARGE = (413, "response too large")
+
+
+def _too_large(response: aiohttp.ClientResponse) -> bool:
+    """True if the declared body size exceeds MAX_BODY_BYTES."""
+    return (response.content_length or 0) > MAX_BODY_BYTES
+
+
+# Shared request headers (never mutated)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide aiohttp session, creating it on first use.
+    
+    The session is bound to the running event loop; a new one is created
+    if the previous session was closed or belongs to another loop.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            enable_cleanup_closed=True
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=SESSION_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    """Close the shared aiohttp session (call from the application's shutdown hook)."""
+    global _session, _session_loop
+    for task in _health_tasks.values():
+        task.cancel()
+    _health_tasks.clear()
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+# Background health probing: callers read the last known state instead of
+# paying a round trip, and the periodic GET keeps a pooled connection warm
+HEALTH_INTERVAL = 5.0
+_health: Dict[str, Dict[str, Any]] = {}
+_health_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _probe_health(url: str) -> bool:
+    """GET the health endpoint once and record the result."""
+    try:
+        session = await get_session()
+        async with session.get(url, timeout=HEALTH_TIMEOUT) as response:
+            ok = response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError):
+        ok = False
+    _health[url] = {"ok": ok, "t": time.monotonic()}
+    return ok
+
+
+async def _health_loop(url: str):
+    while True:
+        await _probe_health(url)
+        await asyncio.sleep(HEALTH_INTERVAL)
+
+
+def _ensure_health_loop(url: str):
+    """Start the background prober for ``url`` on the running loop if needed."""
+    task = _health_tasks.get(url)
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        _health_tasks[url] = asyncio.create_task(_health_loop(url))
+
+
+# Request coalescing for /query-kb
+BATCH_MAX_SIZE = 16
+BATCH_MAX_WAIT = 0.01
+
+
+class KBBatcher:
+    """
+    Coalesces concurrent /query-kb calls into a single POST to /query-kb/batch.
+    
+    Each caller awaits its own future, resolved with ``(status, body)`` where
+    body is the parsed result on 200 and the error text otherwise. If the
+    server has no batch endpoint (404/405) the batcher falls back to
+    concurrent single /query-kb calls for the rest of the process lifetime.
+    """
+    
+    def __init__(self, bhiv_api_url: str, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_queue_time: float = BATCH_MAX_WAIT):
+        self.bhiv_api_url = bhiv_api_url
+        self._url_batch = f"{bhiv_api_url}/query-kb/batch"
+        self._url_query_kb = f"{bhiv_api_url}/query-kb"
+        self._breaker = get_circuit_breaker(bhiv_api_url)
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_supported = True
+        self._tasks: set = set()  # in-flight sends, referenced until done
+    
+    async def submit(self, payload: Dict[str, Any],
+                     timeout: aiohttp.ClientTimeout = QUERY_TIMEOUT) -> tuple:
+        """Queue a query and wait for its (status, body) result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future, timeout))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_queue_time, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Send everything queued so far as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, batch: List[tuple]):
+        try:
+            session = await get_session()
+            
+            if self._batch_supported and len(batch) > 1:
+                async with session.post(
+                    self._url_batch,
+                    data=_dumps({"queries": [payload for payload, _, _ in batch]}),
+                    headers=_JSON_HEADERS,
+                    # One request serves every caller, so give it the most generous budget
+                    timeout=max((t for _, _, t in batch), key=lambda t: t.total or 0)
+                ) as response:
+                    self._breaker.on_response(response.status)
+                    if response.status == 200 and _too_large(response):
+                        for _, future, _ in batch:
+                            if not future.done():
+                                future.set_result(_TOO_LARGE)
+                        return
+                    if response.status == 200:
+                        results = _loads(await response.read()).get("results") or []
+                        if len(results) == len(batch):
+                            for (_, future, _), result in zip(batch, results):
+                                if not future.done():
+                                    future.set_result((200, result))
+                            return
+                        # Results can't be paired with queries; resend them one by one
+                    elif response.status in (404, 405):
+                        self._batch_supported = False
+                    else:
+                        error = (response.status, await response.text())
+                        for _, future, _ in batch:
+                            if not future.done():
+                                future.set_result(error)
+                        return
+            
+            await asyncio.gather(*(
+                self._send_one(session, payload, future, timeout)
+                for payload, future, timeout in batch
+            ))
+        
+        except asyncio.CancelledError:
+            # Don't leave callers awaiting results that will never arrive
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                self._breaker.on_failure()
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # submit() waits without a timeout, so never leave a future unresolved
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("No result returned for batched query"))
+    
+    async def _send_one(self, session: aiohttp.ClientSession, payload: Dict[str, Any],
+                        future: asyncio.Future, timeout: aiohttp.ClientTimeout):
+        try:
+            async with session.post(
+                self._url_query_kb,
+                data=_dumps(payload),
+                headers=_JSON_HEADERS,
+                timeout=timeout
+            ) as response:
+                self._breaker.on_response(response.status)
+                if _too_large(response):
+                    result = _TOO_LARGE
+                elif response.status == 200:
+                    result = (200, _loads(await response.read()))
+                else:
+                    result = (response.status, await response.text())
+            if not future.done():
+                future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                self._breaker.on_failure()
+            if not future.done():
+                future.set_exception(e)
+
+
+_batchers: Dict[str, KBBatcher] = {}
+_SYNC_QUERY_KB_URL = f"{DEFAULT_API_URL}/query-kb"
+
+
+def get_batcher(bhiv_api_url: str) -> KBBatcher:
+    """Get the shared batcher for a BHIV API base URL."""
+    batcher = _batchers.get(bhiv_api_url)
+    if batcher is None:
+        batcher = _batchers[bhiv_api_url] = KBBatcher(bhiv_api_url)
+    return batcher
+
+
 class GurukulKnowledgeBaseClient:
     """
     Production-ready client for integrating Gurukul with BHIV Knowledge Base
     """
     
-    def __init__(self, bhiv_api_url: str = "http://localhost:8001", timeout: int = 30):
+    __slots__ = ("bhiv_api_url", "timeout", "_request_timeout", "session",
+                 "_url_vedas", "_url_edumentor", "_url_health", "_breaker")
+    
+    def __init__(self, bhiv_api_url: str = DEFAULT_API_URL, timeout: int = DEFAULT_TIMEOUT):
         self.bhiv_api_url = bhiv_api_url.rstrip('/')
         self.timeout = timeout
+        self._request_timeout = aiohttp.ClientTimeout(total=timeout, connect=CONNECT_TIMEOUT)
         self.session = None
+        self._url_vedas = f"{self.bhiv_api_url}/ask-vedas"
+        self._url_edumentor = f"{self.bhiv_api_url}/edumentor"
+        self._url_health = f"{self.bhiv_api_url}/health"
+        self._breaker = get_circuit_breaker(self.bhiv_api_url)
     
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self.session = await get_session()
+        _ensure_health_loop(self._url_health)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (the shared session outlives the client)."""
+        self.session = None
     
     # ============================================================================
     # CORE KNOWLEDGE BASE METHODS
@@ -46,44 +323,27 @@ class GurukulKnowledgeBaseClient:
         Returns:
             Dict with response, sources, metadata, and status
         """
+        payload = {
+            "query": query,
+            "filters": filters or {},
+            "user_id": user_id,
+            "limit": 5
+        }
+        
+        breaker = self._breaker
+        if breaker.is_open():
+            return self._format_error("circuit open")
+        
         try:
-            payload = {
-                "query": query,
-                "filters": filters or {},
-                "user_id": user_id,
-                "limit": 5
-            }
-            
-            if self.session:
-                # Async request
-                async with self.session.post(
-                    f"{self.bhiv_api_url}/query-kb",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return self._format_response(result, "success")
-                    else:
-                        error_text = await response.text()
-                        return self._format_error(f"API error {response.status}: {error_text}")
-            else:
-                # Sync request
-                response = requests.post(
-                    f"{self.bhiv_api_url}/query-kb",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return self._format_response(result, "success")
-                else:
-                    return self._format_error(f"API error {response.status_code}: {response.text}")
-                    
+            # Coalesced with concurrent queries on the shared session; the batcher
+            # records one breaker outcome per HTTP request, not per caller
+            status, body = await get_batcher(self.bhiv_api_url).submit(payload, self._request_timeout)
         except Exception as e:
             return self._format_error(f"Connection error: {str(e)}")
+        
+        if status == 200:
+            return self._format_response(body, "success")
+        return self._format_error(f"API error {status}: {body}")
     
     async def ask_vedas(self, question: str, user_id: str = "gurukul_user") -> Dict[str, Any]:
         """
@@ -96,40 +356,8 @@ class GurukulKnowledgeBaseClient:
         Returns:
             Dict with spiritual wisdom response
         """
-        try:
-            payload = {
-                "query": question,
-                "user_id": user_id
-            }
-            
-            if self.session:
-                async with self.session.post(
-                    f"{self.bhiv_api_url}/ask-vedas",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return self._format_response(result, "vedic_wisdom")
-                    else:
-                        error_text = await response.text()
-                        return self._format_error(f"Vedas API error {response.status}: {error_text}")
-            else:
-                response = requests.post(
-                    f"{self.bhiv_api_url}/ask-vedas",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return self._format_response(result, "vedic_wisdom")
-                else:
-                    return self._format_error(f"Vedas API error {response.status_code}: {response.text}")
-                    
-        except Exception as e:
-            return self._format_error(f"Vedas connection error: {str(e)}")
+        body = _QUERY_USER_TMPL % (_dumps(question), _dumps(user_id))
+        return await self._post(self._url_vedas, body, "vedic_wisdom", "Vedas API error", "Vedas connection error")
     
     async def get_educational_content(self, topic: str, user_id: str = "gurukul_user") -> Dict[str, Any]:
         """
@@ -142,40 +370,32 @@ class GurukulKnowledgeBaseClient:
         Returns:
             Dict with educational content
         """
+        body = _QUERY_USER_TMPL % (_dumps(topic), _dumps(user_id))
+        return await self._post(self._url_edumentor, body, "educational", "Education API error", "Education connection error")
+    
+    async def _post(self, url: str, body: bytes, response_type: str,
+                    error_prefix: str, connection_error_prefix: str) -> Dict[str, Any]:
+        """POST a serialized JSON body to the BHIV API and format the result for Gurukul."""
+        breaker = self._breaker
+        if breaker.is_open():
+            return self._format_error("circuit open")
+        
         try:
-            payload = {
-                "query": topic,
-                "user_id": user_id
-            }
-            
-            if self.session:
-                async with self.session.post(
-                    f"{self.bhiv_api_url}/edumentor",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return self._format_response(result, "educational")
-                    else:
-                        error_text = await response.text()
-                        return self._format_error(f"Education API error {response.status}: {error_text}")
-            else:
-                response = requests.post(
-                    f"{self.bhiv_api_url}/edumentor",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return self._format_response(result, "educational")
-                else:
-                    return self._format_error(f"Education API error {response.status_code}: {response.text}")
-                    
+            session = self.session or await get_session()
+            async with session.post(url, data=body, headers=_JSON_HEADERS,
+                                    timeout=self._request_timeout) as response:
+                breaker.on_response(response.status)
+                if _too_large(response):
+                    return self._format_error("response too large")
+                if response.status == 200:
+                    return self._format_response(_loads(await response.read()), response_type)
+                error_text = await response.text()
+                return self._format_error(f"{error_prefix} {response.status}: {error_text}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            breaker.on_failure()
+            return self._format_error(f"{connection_error_prefix}: {str(e)}")
         except Exception as e:
-            return self._format_error(f"Education connection error: {str(e)}")
+            return self._format_error(f"{connection_error_prefix}: {str(e)}")
     
     # ============================================================================
     # SPECIALIZED SEARCH METHODS
@@ -183,21 +403,21 @@ class GurukulKnowledgeBaseClient:
     
     async def search_by_book(self, query: str, book: str, user_id: str = "gurukul_user") -> Dict[str, Any]:
         """Search within a specific Vedic book."""
-        filters = {"book": book.lower()}
+        filters = {"book": _LOWER(book)}
         return await self.query_knowledge_base(query, filters, user_id)
     
     async def search_by_type(self, query: str, content_type: str, user_id: str = "gurukul_user") -> Dict[str, Any]:
         """Search by content type (dharma, artha, kama, moksha)."""
-        filters = {"type": content_type.lower()}
+        filters = {"type": _LOWER(content_type)}
         return await self.query_knowledge_base(query, filters, user_id)
     
     async def advanced_search(self, query: str, book: str = None, content_type: str = None, user_id: str = "gurukul_user") -> Dict[str, Any]:
         """Advanced search with multiple filters."""
         filters = {}
         if book:
-            filters["book"] = book.lower()
+            filters["book"] = _LOWER(book)
         if content_type:
-            filters["type"] = content_type.lower()
+            filters["type"] = _LOWER(content_type)
         
         return await self.query_knowledge_base(query, filters, user_id)
     
@@ -205,23 +425,27 @@ class GurukulKnowledgeBaseClient:
     # UTILITY METHODS
     # ============================================================================
     
-    def _format_response(self, result: Dict[str, Any], response_type: str) -> Dict[str, Any]:
+    @staticmethod
+    def _format_response(result: Dict[str, Any], response_type: str,
+                         max_sources: int = MAX_SOURCES) -> Dict[str, Any]:
         """Format API response for Gurukul consumption."""
+        sources = result.get("sources") or []
         return {
             "success": True,
             "type": response_type,
             "response": result.get("response", ""),
-            "sources": result.get("sources", []),
+            "sources": sources[:max_sources],
             "knowledge_base_results": result.get("knowledge_base_results", 0),
             "metadata": {
                 "query_id": result.get("query_id"),
-                "timestamp": datetime.now().isoformat(),
+                "sources_truncated": len(sources) > max_sources,
                 "processing_time": result.get("processing_time"),
                 "model_used": result.get("model_used")
             }
         }
     
-    def _format_error(self, error_message: str) -> Dict[str, Any]:
+    @staticmethod
+    def _format_error(error_message: str) -> Dict[str, Any]:
         """Format error response for Gurukul consumption."""
         return {
             "success": False,
@@ -230,22 +454,17 @@ class GurukulKnowledgeBaseClient:
             "sources": [],
             "knowledge_base_results": 0,
             "metadata": {
-                "timestamp": datetime.now().isoformat(),
                 "error_type": "api_error"
             }
         }
     
     async def health_check(self) -> bool:
-        """Check if BHIV API is healthy."""
-        try:
-            if self.session:
-                async with self.session.get(f"{self.bhiv_api_url}/health") as response:
-                    return response.status == 200
-            else:
-                response = requests.get(f"{self.bhiv_api_url}/health", timeout=5)
-                return response.status_code == 200
-        except:
-            return False
+        """Check if BHIV API is healthy (cached; refreshed in the background)."""
+        _ensure_health_loop(self._url_health)
+        state = _health.get(self._url_health)
+        if state is not None and time.monotonic() - state["t"] < HEALTH_INTERVAL:
+            return state["ok"]
+        return await _probe_health(self._url_health)
 
 
 # ============================================================================
@@ -266,23 +485,30 @@ def call_knowledge_base_sync(query: str, filters: Dict[str, Any] = None, user_id
         else:
             return "Knowledge base unavailable"
     """
-    client = GurukulKnowledgeBaseClient()
+    breaker = get_circuit_breaker(_SYNC_QUERY_KB_URL)
+    if breaker.is_open():
+        return GurukulKnowledgeBaseClient._format_error("circuit open")
     
     try:
-        # Run async function in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(client.query_knowledge_base(query, filters, user_id))
-        loop.close()
-        return result
+        body = _QUERY_KB_TMPL % (_dumps(query), _dumps(user_id), _dumps(filters or {}))
+        # Plain blocking call on the pooled session; no event loop needed
+        response = SHARED_SESSION.post(
+            _SYNC_QUERY_KB_URL,
+            data=body,
+            headers=_JSON_HEADERS,
+            timeout=DEFAULT_TIMEOUT
+        )
+        breaker.on_response(response.status_code)
+        
+        if response.status_code == 200:
+            return GurukulKnowledgeBaseClient._format_response(_loads(response.content), "success")
+        return GurukulKnowledgeBaseClient._format_error(f"API error {response.status_code}: {response.text}")
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+            requests.exceptions.RetryError) as e:
+        breaker.on_failure()
+        return GurukulKnowledgeBaseClient._format_error(f"Connection error: {str(e)}")
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "response": "Knowledge base connection failed",
-            "sources": [],
-            "knowledge_base_results": 0
-        }
+        return GurukulKnowledgeBaseClient._format_error(f"Connection error: {str(e)}")
 
 # Async function for modern Gurukul backends
 async def call_knowledge_base_async(query: str, filters: Dict[str, Any] = None, user_id: str = "gurukul_user") -> Dict[str, Any]:
@@ -298,8 +524,9 @@ async def call_knowledge_base_async(query: str, filters: Dict[str, Any] = None,
         else:
             return "Knowledge base unavailable"
     """
-    async with GurukulKnowledgeBaseClient() as client:
-        return await client.query_knowledge_base(query, filters, user_id)
+    client = GurukulKnowledgeBaseClient()
+    client.session = await get_session()
+    return await client.query_knowledge_base(query, filters, user_id)
 
 
 # ============================================================================
@@ -311,36 +538,40 @@ async def example_gurukul_integration():
     
     print("🏫 [GURUKUL] Example BHIV Knowledge Base Integration")
     
-    # Initialize client
-    async with GurukulKnowledgeBaseClient() as kb_client:
+    try:
+        # Initialize client
+        async with GurukulKnowledgeBaseClient() as kb_client:
         
-        # Check health
-        if not await kb_client.health_check():
-            print("❌ [ERROR] BHIV API is not available")
-            return
+            # Check health
+            if not await kb_client.health_check():
+                print("❌ [ERROR] BHIV API is not available")
+                return
         
-        print("✅ [HEALTH] BHIV API is healthy")
+            print("✅ [HEALTH] BHIV API is healthy")
         
-        # Example 1: General knowledge query
-        print("\n📚 [EXAMPLE 1] General knowledge query")
-        result = await kb_client.query_knowledge_base("what is dharma", user_id="gurukul_student_123")
-        print(f"Response: {result['response'][:100]}...")
-        print(f"Sources: {len(result['sources'])} found")
+            # Example 1: General knowledge query
+            print("\n📚 [EXAMPLE 1] General knowledge query")
+            result = await kb_client.query_knowledge_base("what is dharma", user_id="gurukul_student_123")
+            print(f"Response: {result['response'][:100]}...")
+            print(f"Sources: {len(result['sources'])} found")
         
-        # Example 2: Ask the Vedas
-        print("\n🕉️  [EXAMPLE 2] Ask the Vedas")
-        result = await kb_client.ask_vedas("How should I live a righteous life?", user_id="gurukul_student_123")
-        print(f"Vedic Wisdom: {result['response'][:100]}...")
+            # Example 2: Ask the Vedas
+            print("\n🕉️  [EXAMPLE 2] Ask the Vedas")
+            result = await kb_client.ask_vedas("How should I live a righteous life?", user_id="gurukul_student_123")
+            print(f"Vedic Wisdom: {result['response'][:100]}...")
         
-        # Example 3: Search specific book
-        print("\n📖 [EXAMPLE 3] Search in Rigveda")
-        result = await kb_client.search_by_book("fire rituals", "rigveda", user_id="gurukul_student_123")
-        print(f"Rigveda Results: {result['knowledge_base_results']} chunks found")
+            # Example 3: Search specific book
+            print("\n📖 [EXAMPLE 3] Search in Rigveda")
+            result = await kb_client.search_by_book("fire rituals", "rigveda", user_id="gurukul_student_123")
+            print(f"Rigveda Results: {result['knowledge_base_results']} chunks found")
         
-        # Example 4: Educational content
-        print("\n🎓 [EXAMPLE 4] Educational content")
-        result = await kb_client.get_educational_content("Sanskrit grammar", user_id="gurukul_student_123")
-        print(f"Educational Content: {result['response'][:100]}...")
+            # Example 4: Educational content
+            print("\n🎓 [EXAMPLE 4] Educational content")
+            result = await kb_client.get_educational_content("Sanskrit grammar", user_id="gurukul_student_123")
+            print(f"Educational Content: {result['response'][:100]}...")
+    finally:
+        # Stops the background health prober and closes the shared session
+        await close_session()
 
 
 if __name__ == "__main__":
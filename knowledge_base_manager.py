@@ -5,8 +5,12 @@ Manages knowledge base files on the company NAS server
 """
 
 import os
+import sys
 import json
 import shutil
+import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
@@ -16,6 +20,63 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None).encode()
+
+    _loads = json.loads
+
+# Transfer unit for NAS copies; SMB/NFS round trips favour 128 KiB - 1 MiB chunks
+COPY_BUFFER_SIZE = int(os.getenv("NAS_COPY_BUFFER_SIZE", str(1 << 20)))
+
+# Fold the append-only index journal back into index.json after this many entries
+INDEX_COMPACT_THRESHOLD = 500
+
+# Journals renamed aside by a compaction that died before removing them are
+# cleaned up by the next compaction once they are this old (seconds)
+INDEX_ASIDE_STALE_AFTER = 60.0
+
+# Cached index is re-checked (two stats) at most this often; the optional
+# background refresher polls on its own interval instead
+INDEX_REVALIDATE_INTERVAL = 5.0
+INDEX_REFRESH_INTERVAL = 30.0
+
+# UNC shares already mapped with 'net use' by this process
+_MAPPED_SHARES = set()
+_mapped_shares_lock = threading.Lock()
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via a temp file and os.replace so readers never see a partial file"""
+    # Unique temp name so concurrent writers (threads or other hosts) never share one
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if os.name == "posix":
+            # mkstemp creates 0600; keep the usual permissions for other readers
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    if os.name == "posix":
+        # Persist the rename itself; directories can't be opened for fsync on Windows
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
 class NASKnowledgeBaseManager:
     """Manages knowledge base files on the NAS server"""
     
@@ -31,16 +92,28 @@ class NASKnowledgeBaseManager:
         self.documents_path = self.knowledge_base_path / "documents"
         self.metadata_path = self.knowledge_base_path / "metadata"
         self.index_file = self.knowledge_base_path / "index.json"
+        self.index_journal = self.knowledge_base_path / "index.jsonl"
         
-        # Create directories if they don't exist
-        self._ensure_directories()
+        # In-memory view of index.json + journal, loaded on first use
+        self._index: Optional[Dict[str, Dict]] = None
+        self._journal_entries = 0
+        self._index_stamp = None
+        self._index_checked_at = 0.0
+        self._index_lock = threading.RLock()
+        self._refresher: Optional[threading.Thread] = None
+        
+        # Directories are created on first write; read-only use costs no mkdir round trips
+        self._dirs_ready = False
     
     def _ensure_directories(self):
-        """Create necessary directories on the NAS"""
+        """Create necessary directories on the NAS (once per manager)"""
+        if self._dirs_ready:
+            return
         try:
             self.knowledge_base_path.mkdir(exist_ok=True)
             self.documents_path.mkdir(exist_ok=True)
             self.metadata_path.mkdir(exist_ok=True)
+            self._dirs_ready = True
             logger.info(f"Knowledge base directories ensured at: {self.knowledge_base_path}")
         except Exception as e:
             logger.error(f"Failed to create directories: {e}")
@@ -53,21 +126,13 @@ class NASKnowledgeBaseManager:
             nas_user = os.getenv("NAS_USERNAME")
             nas_pass = os.getenv("NAS_PASSWORD")
             nas_domain = os.getenv("NAS_DOMAIN", "")
+            path_exists = self.nas_path.exists()
             # If credentials exist and path not accessible, try mapping via 'net use'
-            if nas_user and nas_pass and not self.nas_path.exists():
-                try:
-                    # net use \\server\share password /user:domain\user
-                    share = str(self.nas_path)
-                    user_spec = f"{nas_domain}\\{nas_user}" if nas_domain else nas_user
-                    cmd = [
-                        "net", "use", share, nas_pass, f"/user:{user_spec}", "/persistent:no"
-                    ]
-                    import subprocess
-                    subprocess.run(cmd, capture_output=True, text=True, timeout=20)
-                except Exception as e:
-                    logger.warning(f"Failed to map NAS share via 'net use': {e}")
+            if nas_user and nas_pass and not path_exists:
+                self._map_share(nas_user, nas_pass, nas_domain)
+                path_exists = self.nas_path.exists()
             # Test basic access
-            if not self.nas_path.exists():
+            if not path_exists:
                 logger.error(f"NAS path does not exist: {self.nas_path}")
                 return False
             
@@ -83,6 +148,29 @@ class NASKnowledgeBaseManager:
             logger.error(f"❌ NAS connection test failed: {e}")
             return False
     
+    def _map_share(self, nas_user: str, nas_pass: str, nas_domain: str):
+        """Map the UNC share with 'net use' at most once per process (Windows only)"""
+        share = str(self.nas_path)
+        if os.name != "nt":
+            return
+        with _mapped_shares_lock:
+            if share in _MAPPED_SHARES:
+                return
+            try:
+                # net use \\server\share password /user:domain\user
+                user_spec = f"{nas_domain}\\{nas_user}" if nas_domain else nas_user
+                cmd = [
+                    "net", "use", share, nas_pass, f"/user:{user_spec}", "/persistent:no"
+                ]
+                import subprocess
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=20)
+                if result.returncode == 0:
+                    _MAPPED_SHARES.add(share)
+                else:
+                    logger.warning(f"'net use' failed for {share}: {result.stderr.strip()}")
+            except Exception as e:
+                logger.warning(f"Failed to map NAS share via 'net use': {e}")
+    
     def upload_document(self, local_file_path: str, document_id: Optional[str] = None) -> str:
         """
         Upload a document to the knowledge base
@@ -105,8 +193,9 @@ class NASKnowledgeBaseManager:
             document_id = f"{local_path.stem}_{timestamp}"
         
         # Copy file to NAS
+        self._ensure_directories()
         nas_file_path = self.documents_path / f"{document_id}{local_path.suffix}"
-        shutil.copy2(local_path, nas_file_path)
+        self._fast_copy(local_path, nas_file_path)
         
         # Create metadata
         metadata = {
@@ -120,7 +209,7 @@ class NASKnowledgeBaseManager:
         
         # Save metadata
         metadata_file = self.metadata_path / f"{document_id}.json"
-        metadata_file.write_text(json.dumps(metadata, indent=2))
+        _atomic_write(metadata_file, _dumps(metadata, indent=True))
         
         # Update index
         self._update_index(document_id, metadata)
@@ -128,14 +217,51 @@ class NASKnowledgeBaseManager:
         logger.info(f"✅ Document uploaded: {document_id}")
         return document_id
     
+    def _fast_copy(self, src: Path, dst: Path):
+        """Copy a file to the NAS using the kernel's copy path where available"""
+        if sys.platform == "win32":
+            # CopyFileW lets the SMB redirector copy server-side and keeps file attributes
+            import ctypes
+            if ctypes.windll.kernel32.CopyFileW(str(src), str(dst), False):
+                return
+            logger.warning(f"CopyFileW failed for {src}, falling back to buffered copy")
+        
+        with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+            copied = False
+            if sys.platform.startswith("linux"):
+                try:
+                    offset = 0
+                    while True:
+                        sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, COPY_BUFFER_SIZE)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    copied = True
+                except OSError:
+                    # Some filesystems (e.g. certain FUSE/SMB mounts) reject sendfile
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    fdst.truncate()
+            
+            if not copied:
+                buf = bytearray(COPY_BUFFER_SIZE)
+                view = memoryview(buf)
+                while True:
+                    n = fsrc.readinto(buf)
+                    if not n:
+                        break
+                    # Raw (unbuffered) writes may be partial
+                    chunk = view[:n]
+                    while chunk:
+                        chunk = chunk[fdst.write(chunk):]
+        
+        shutil.copystat(src, dst)
+    
     def list_documents(self) -> List[Dict]:
         """List all documents in the knowledge base"""
         try:
-            if not self.index_file.exists():
-                return []
-            
-            index_data = json.loads(self.index_file.read_text())
-            return list(index_data.get("documents", {}).values())
+            # Copies, so callers can't mutate the cached index
+            return [dict(metadata) for metadata in self._load_index().values()]
             
         except Exception as e:
             logger.error(f"Failed to list documents: {e}")
@@ -144,11 +270,13 @@ class NASKnowledgeBaseManager:
     def get_document_path(self, document_id: str) -> Optional[Path]:
         """Get the NAS path for a document"""
         try:
-            metadata_file = self.metadata_path / f"{document_id}.json"
-            if not metadata_file.exists():
-                return None
-            
-            metadata = json.loads(metadata_file.read_text())
+            # The index carries the same metadata; fall back to the per-document file
+            metadata = self._load_index().get(document_id)
+            if metadata is None:
+                metadata_file = self.metadata_path / f"{document_id}.json"
+                if not metadata_file.exists():
+                    return None
+                metadata = _loads(metadata_file.read_bytes())
             return Path(metadata["nas_path"])
             
         except Exception as e:
@@ -178,21 +306,157 @@ class NASKnowledgeBaseManager:
             logger.error(f"Failed to delete document {document_id}: {e}")
             return False
     
-    def _update_index(self, document_id: str, metadata: Dict):
-        """Update the main index file"""
+    def _index_files_stamp(self) -> tuple:
+        """(index.json mtime, journal size): changes whenever any writer touches the index"""
+        stamp = []
+        for path, field in ((self.index_file, "st_mtime_ns"), (self.index_journal, "st_size")):
+            try:
+                stamp.append(getattr(path.stat(), field))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+    
+    def _replay_journal(self, path: Path, documents: Dict[str, Dict]) -> tuple:
+        """Apply one journal file to documents; returns (entries, torn)"""
+        entries = 0
+        torn = False
         try:
-            # Load existing index
-            if self.index_file.exists():
-                index_data = json.loads(self.index_file.read_text())
-            else:
-                index_data = {"documents": {}, "last_updated": None}
+            journal = open(path, "rb")
+        except FileNotFoundError:
+            return entries, torn
+        
+        with journal:
+            for line in journal:
+                torn = not line.endswith(b"\n")
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    # Torn trailing write from an interrupted append
+                    continue
+                if entry["op"] == "put":
+                    documents[entry["id"]] = entry["meta"]
+                else:
+                    documents.pop(entry["id"], None)
+                entries += 1
+        return entries, torn
+    
+    def _aside_journals(self) -> List[Path]:
+        """Journals renamed aside by in-flight (or crashed) compactions, oldest first"""
+        return sorted(self.knowledge_base_path.glob("index.jsonl.*.compact"))
+    
+    def _read_index_files(self) -> tuple:
+        """Read index.json and replay the journals without touching cached state"""
+        stamp = self._index_files_stamp()
+        documents = {}
+        if self.index_file.exists():
+            documents = _loads(self.index_file.read_bytes()).get("documents", {})
+        
+        for aside in self._aside_journals():
+            self._replay_journal(aside, documents)
+        entries, torn = self._replay_journal(self.index_journal, documents)
+        
+        return documents, entries, torn, stamp
+    
+    def _install_index(self, documents: Dict[str, Dict], entries: int, torn: bool, stamp: tuple):
+        self._index = documents
+        self._journal_entries = entries
+        self._index_stamp = stamp
+        self._index_checked_at = time.monotonic()
+        if torn:
+            # Fold it away now so the next append doesn't land on the partial line
+            self._compact_index()
+    
+    def _revalidate_index(self):
+        """Reload the cached index only if the files changed since it was read"""
+        stamp = self._index_files_stamp()
+        self._index_checked_at = time.monotonic()
+        if stamp != self._index_stamp:
+            self._install_index(*self._read_index_files())
+    
+    def _load_index(self) -> Dict[str, Dict]:
+        """Return the cached index, loading it on first use and re-checking it when stale"""
+        with self._index_lock:
+            if self._index is None:
+                self._install_index(*self._read_index_files())
+            elif (self._refresher is None
+                  and time.monotonic() - self._index_checked_at >= INDEX_REVALIDATE_INTERVAL):
+                self._revalidate_index()
+            return self._index
+    
+    def start_index_refresher(self, interval: float = INDEX_REFRESH_INTERVAL):
+        """Revalidate the index from a daemon thread so reads never wait on the NAS"""
+        if self._refresher is not None:
+            return
+        
+        def refresh():
+            while True:
+                time.sleep(interval)
+                try:
+                    stamp = self._index_files_stamp()
+                    if stamp == self._index_stamp:
+                        continue
+                    # Read outside the lock; only the swap blocks readers
+                    loaded = self._read_index_files()
+                    with self._index_lock:
+                        self._install_index(*loaded)
+                except Exception as e:
+                    logger.warning(f"Background index refresh failed: {e}")
+        
+        self._load_index()
+        self._refresher = threading.Thread(target=refresh, name="kb-index-refresh", daemon=True)
+        self._refresher.start()
+    
+    def _append_to_journal(self, entry: Dict):
+        """Record an index change as one appended line instead of rewriting the index"""
+        line = _dumps(entry) + b"\n"
+        with open(self.index_journal, "ab") as journal:
+            journal.write(line)
+        
+        # Account for our own write so it doesn't look like an external change
+        index_mtime, journal_size = self._index_stamp
+        self._index_stamp = (index_mtime, (journal_size or 0) + len(line))
+        self._journal_entries += 1
+        if self._journal_entries >= INDEX_COMPACT_THRESHOLD:
+            self._compact_index()
+    
+    def _compact_index(self):
+        """
+        Fold the journal into index.json and start a fresh one
+        
+        The journal is renamed aside and replayed from disk instead of trusting
+        the in-memory view, which may miss entries other processes appended
+        since it was last revalidated; their later appends go to a new journal.
+        """
+        with self._index_lock:
+            aside = self.knowledge_base_path / f"index.jsonl.{time.time_ns()}.{os.getpid()}.compact"
+            try:
+                os.replace(self.index_journal, aside)
+            except FileNotFoundError:
+                pass
             
-            # Update index
-            index_data["documents"][document_id] = metadata
-            index_data["last_updated"] = datetime.now().isoformat()
+            documents, entries, _, stamp = self._read_index_files()
+            index_data = {"documents": documents, "last_updated": datetime.now().isoformat()}
+            _atomic_write(self.index_file, _dumps(index_data, indent=True))
+            
+            # Replaying an already-folded journal over the new index is harmless,
+            # so the aside copies go only after index.json is durable
+            aside.unlink(missing_ok=True)
+            stale_before = time.time_ns() - int(INDEX_ASIDE_STALE_AFTER * 1e9)
+            for leftover in self._aside_journals():
+                if int(leftover.name.split(".")[2]) < stale_before:
+                    leftover.unlink(missing_ok=True)
             
-            # Save index
-            self.index_file.write_text(json.dumps(index_data, indent=2))
+            self._index = documents
+            self._journal_entries = entries
+            self._index_stamp = (self.index_file.stat().st_mtime_ns, stamp[1])
+            self._index_checked_at = time.monotonic()
+    
+    def _update_index(self, document_id: str, metadata: Dict):
+        """Add or replace a document in the index"""
+        try:
+            with self._index_lock:
+                self._load_index()[document_id] = metadata
+                self._append_to_journal({"op": "put", "id": document_id, "meta": metadata})
             
         except Exception as e:
             logger.error(f"Failed to update index: {e}")
@@ -200,25 +464,37 @@ class NASKnowledgeBaseManager:
     def _remove_from_index(self, document_id: str):
         """Remove a document from the index"""
         try:
-            if not self.index_file.exists():
-                return
-            
-            index_data = json.loads(self.index_file.read_text())
-            if document_id in index_data.get("documents", {}):
-                del index_data["documents"][document_id]
-                index_data["last_updated"] = datetime.now().isoformat()
-                self.index_file.write_text(json.dumps(index_data, indent=2))
+            with self._index_lock:
+                self._load_index().pop(document_id, None)
+                # Journal the delete even if our (possibly stale) view lacks the
+                # document; another process may have added it since we last looked
+                self._append_to_journal({"op": "del", "id": document_id})
                 
         except Exception as e:
             logger.error(f"Failed to remove from index: {e}")
     
-    def get_stats(self) -> Dict:
-        """Get knowledge base statistics"""
+    def _scan_documents(self) -> Dict[str, os.stat_result]:
+        """Stat every stored document from a single directory listing"""
+        # On Windows/SMB the listing already carries the stat data, so no per-file round trips
+        try:
+            with os.scandir(self.documents_path) as entries:
+                return {entry.name: entry.stat() for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            # Nothing uploaded yet
+            return {}
+    
+    def get_stats(self, verify: bool = False) -> Dict:
+        """
+        Get knowledge base statistics
+        
+        Args:
+            verify: Also reconcile the index against the files actually on the NAS
+        """
         try:
             documents = self.list_documents()
             total_size = sum(doc.get("file_size", 0) for doc in documents)
             
-            return {
+            stats = {
                 "total_documents": len(documents),
                 "total_size_bytes": total_size,
                 "total_size_mb": round(total_size / (1024 * 1024), 2),
@@ -226,6 +502,17 @@ class NASKnowledgeBaseManager:
                 "knowledge_base_path": str(self.knowledge_base_path)
             }
             
+            if verify:
+                on_disk = self._scan_documents()
+                indexed = {Path(doc["nas_path"]).name for doc in documents if "nas_path" in doc}
+                stats.update({
+                    "on_disk_size_bytes": sum(st.st_size for st in on_disk.values()),
+                    "missing_documents": sorted(indexed - on_disk.keys()),
+                    "orphaned_files": sorted(on_disk.keys() - indexed)
+                })
+            
+            return stats
+            
         except Exception as e:
             logger.error(f"Failed to get stats: {e}")
             return {}
@@ -5,11 +5,16 @@ Loads PDF and text files into Qdrant vector database for the BHIV knowledge syst
 """
 
 import os
+import re
 import sys
+import functools
 import json
 import uuid
+import hashlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
 from utils.quadrant_loader import QdrantLoader
 from utils.file_utils import secure_file_access
 from utils.logger import get_logger
@@ -17,11 +22,242 @@ from config.settings import QDRANT_CONFIG
 
 logger = get_logger(__name__)
 
+# Chunks per forward pass when embedding a document
+EMBED_BATCH_SIZE = 64
+
+# Chunking window; matches QdrantLoader's splitter settings
+CHUNK_SIZE = 400
+CHUNK_OVERLAP = 50
+
+# Points from many files are buffered and sent with the bulk uploader
+UPLOAD_BATCH_SIZE = 256
+UPLOAD_PARALLEL = 4
+UPLOAD_FLUSH_POINTS = 4096
+
+# Processes extracting and chunking PDFs while the main process embeds
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+
+# Optional ONNX Runtime embedding backend (EMBEDDING_BACKEND=onnx)
+try:
+    import numpy as np
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers").lower()
+ONNX_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("models", "onnx", "all-MiniLM-L6-v2"))
+ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "false").lower() == "true"
+ONNX_MAX_SEQ_LENGTH = 256
+
+
+class OnnxEmbedder:
+    """
+    ONNX Runtime replacement for the SentenceTransformer used by QdrantLoader.
+    
+    The model is exported once (optionally int8-quantized) into ONNX_MODEL_DIR
+    and reused on later runs. ``encode`` mirrors SentenceTransformer.encode for
+    the arguments this loader uses and applies the same mean pooling.
+    """
+    
+    def __init__(self, model_name: str = ONNX_MODEL_NAME, cache_dir: str = ONNX_MODEL_DIR,
+                 quantize: bool = ONNX_QUANTIZE):
+        model_file = "model_quantized.onnx" if quantize else "model.onnx"
+        if not os.path.exists(os.path.join(cache_dir, model_file)):
+            self._export(model_name, cache_dir, quantize)
+        
+        providers = onnxruntime.get_available_providers()
+        provider = "CUDAExecutionProvider" if "CUDAExecutionProvider" in providers else "CPUExecutionProvider"
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            cache_dir, file_name=model_file, provider=provider
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        logger.info(f"ONNX embedder ready ({model_file}, {provider})")
+    
+    @staticmethod
+    def _export(model_name: str, cache_dir: str, quantize: bool):
+        logger.info(f"Exporting {model_name} to ONNX at {cache_dir}")
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(cache_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(cache_dir)
+        
+        if quantize:
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            )
+    
+    def encode(self, sentences: List[str], batch_size: int = EMBED_BATCH_SIZE,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False):
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=ONNX_MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            
+            # Mean pooling over real tokens, as SentenceTransformer does
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        
+        embeddings = np.vstack(batches) if batches else np.empty((0, 384), dtype=np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def _last_space(text: str, start: int, end: int) -> int:
+    """Index of the last space/newline in text[start:end], or -1."""
+    return max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+
+
+def _next_space(text: str, start: int, end: int) -> int:
+    """Index of the first space/newline in text[start:end], or -1."""
+    hits = [i for i in (text.find(" ", start, end), text.find("\n", start, end)) if i != -1]
+    return min(hits) if hits else -1
+
+
+def split_text(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Single-pass sliding-window chunker.
+    
+    Windows of at most ``chunk_size`` characters are cut at the last whitespace
+    and overlap the previous window by up to ``chunk_overlap`` characters,
+    starting on a word boundary. All scanning is done by str.find/rfind.
+    """
+    chunks = []
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            cut = _last_space(text, start + chunk_overlap + 1, end)
+            if cut != -1:
+                end = cut
+        
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+        
+        # Back up for the overlap without starting mid-word
+        start = end - chunk_overlap
+        if not text[start - 1].isspace():
+            space = _next_space(text, start, end)
+            start = space + 1 if space != -1 else end
+    return chunks
+
+
+def iter_chunks(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    Chunk a stream of text pieces (e.g. PDF pages) without joining them.
+    
+    The unfinished last chunk of each piece is carried into the next one, so
+    only one piece plus a chunk-sized tail is held at a time.
+    """
+    carry = ""
+    for piece in pieces:
+        chunks = split_text(f"{carry}\n\n{piece}" if carry else piece)
+        if not chunks:
+            continue
+        carry = chunks.pop()
+        yield from chunks
+    if carry:
+        yield carry
+
+
+def _extract_pdf_chunks(pdf_path: str) -> Tuple[int, List[str]]:
+    """
+    Process-pool worker: extract and chunk one PDF, returning (page count, chunks).
+    
+    Pages are streamed inside the worker, but the chunk list for the whole file
+    is returned (pickled) to the parent, so peak memory is bounded per file:
+    roughly the largest PDF's extracted text, plus its embedded points in
+    _embed_chunks. Split very large PDFs if that matters.
+    """
+    stats = {"pages": 0}
+    
+    def pages():
+        for page_text in secure_file_access.iter_pdf_pages(pdf_path):
+            stats["pages"] += 1
+            if page_text:
+                yield page_text
+    
+    chunks = list(iter_chunks(pages()))
+    return stats["pages"], chunks
+
+
+# Simple heuristic to extract book names; earlier keys win when several match
+_VEDIC_BOOKS = {
+    "rigveda": "rigveda",
+    "samaveda": "samaveda",
+    "yajurveda": "yajurveda",
+    "atharvaveda": "atharvaveda",
+    "bhagavad": "bhagavad_gita",
+    "gita": "bhagavad_gita",
+    "upanishad": "upanishads",
+    "purana": "puranas",
+    "ramayana": "ramayana",
+    "mahabharata": "mahabharata"
+}
+_BOOK_PRIORITY = {key: rank for rank, key in enumerate(_VEDIC_BOOKS)}
+# Lookahead so overlapping keywords are all reported
+_BOOK_RE = re.compile("(?=(" + "|".join(map(re.escape, _VEDIC_BOOKS)) + "))")
+
+
+@functools.lru_cache(maxsize=4096)
+def _book_name_for(file_name: str) -> str:
+    matches = _BOOK_RE.findall(file_name.lower())
+    if not matches:
+        return file_name  # Default to file name
+    return _VEDIC_BOOKS[min(matches, key=_BOOK_PRIORITY.__getitem__)]
+
+
+def _point_id(source: str, chunk_id: int) -> str:
+    """Deterministic UUID for a chunk, so re-loading a file overwrites its points."""
+    digest = hashlib.blake2b(f"{source}:{chunk_id}".encode("utf-8"), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_loader() -> QdrantLoader:
+    """Process-wide QdrantLoader, so the embedding model is loaded once."""
+    return QdrantLoader()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    """Process-wide embedding backend (ONNX when requested and installed)."""
+    if EMBEDDING_BACKEND == "onnx" and ONNX_AVAILABLE:
+        return OnnxEmbedder()
+    if EMBEDDING_BACKEND == "onnx":
+        logger.warning("EMBEDDING_BACKEND=onnx but optimum/onnxruntime are not installed; using SentenceTransformer")
+    
+    model = _get_loader().model
+    if model.device.type == "cuda":
+        # Half precision halves memory traffic; cosine ranking is unaffected
+        model.half()
+    return model
+
+
 class DataLoader:
     """Production-grade data loader for Qdrant knowledge base."""
     
     def __init__(self):
-        self.loader = QdrantLoader()
+        self.loader = _get_loader()
+        self.encoder = _get_encoder()
         self.collection_name = QDRANT_CONFIG.get("collection_name", "vedas_knowledge_base")
         self.data_directory = os.getcwd()  # Current directory
         
@@ -36,12 +272,20 @@ class DataLoader:
             logger.error(f"Failed to initialize Qdrant: {str(e)}")
             return False
     
+    def _discover_files(self, extensions: Tuple[str, ...]) -> List[str]:
+        """List files in the data directory by extension from a single scandir pass."""
+        # Paths still go through secure_file_access checks when they are read
+        with os.scandir(self.data_directory) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.lower().endswith(extensions) and entry.is_file()
+            ]
+    
     def load_pdf_files(self, pdf_paths: List[str] = None) -> Dict[str, Any]:
         """Load PDF files into Qdrant."""
         if pdf_paths is None:
             # Auto-discover PDF files in current directory
-            pdf_files = secure_file_access.list_files(self.data_directory, ['.pdf'])
-            pdf_paths = [file['path'] for file in pdf_files]
+            pdf_paths = self._discover_files(('.pdf',))
         
         results = {
             "loaded": [],
@@ -49,20 +293,14 @@ class DataLoader:
             "total_files": len(pdf_paths),
             "total_chunks": 0
         }
+        pending_points, pending_files = [], []
         
-        for pdf_path in pdf_paths:
+        for pdf_path, extracted, error in self._extract_pdfs(pdf_paths):
             try:
                 logger.info(f"Loading PDF: {pdf_path}")
-                
-                # Extract text using secure file access
-                pdf_data = secure_file_access.read_pdf(pdf_path)
-                
-                if pdf_data["status"] != "success":
-                    results["failed"].append({
-                        "file": pdf_path,
-                        "error": pdf_data.get("error", "Unknown error")
-                    })
-                    continue
+                if error is not None:
+                    raise error
+                total_pages, chunks = extracted
                 
                 # Prepare metadata
                 file_name = Path(pdf_path).stem
@@ -72,20 +310,19 @@ class DataLoader:
                     "type": "vedic_text",  # Default type
                     "book": self._extract_book_name(file_name),
                     "version": "v1",
-                    "total_pages": pdf_data["metadata"].get("total_pages", 0),
-                    "file_size": pdf_data["metadata"].get("file_size", 0),
-                    "loaded_at": str(uuid.uuid4())
+                    "total_pages": total_pages,
+                    "file_size": os.path.getsize(pdf_path),
+                    "loaded_at": datetime.now().isoformat()
                 }
                 
-                # Load into Qdrant using the text content
-                self._load_text_to_qdrant(pdf_data["text"], metadata)
-                
-                results["loaded"].append({
+                # Embed; upload happens in bulk across files
+                pending_points.extend(self._embed_chunks(chunks, metadata))
+                pending_files.append({
                     "file": pdf_path,
                     "metadata": metadata
                 })
-                
-                logger.info(f"Successfully loaded {pdf_path}")
+                if len(pending_points) >= UPLOAD_FLUSH_POINTS:
+                    self._flush_points(pending_points, pending_files, results)
                 
             except Exception as e:
                 logger.error(f"Failed to load {pdf_path}: {str(e)}")
@@ -94,21 +331,41 @@ class DataLoader:
                     "error": str(e)
                 })
         
+        self._flush_points(pending_points, pending_files, results)
         logger.info(f"PDF loading complete: {len(results['loaded'])} successful, {len(results['failed'])} failed")
         return results
     
+    def _extract_pdfs(self, pdf_paths: List[str]):
+        """Yield (path, (pages, chunks), error) per PDF, extracting in worker processes."""
+        workers = min(PDF_WORKERS, len(pdf_paths))
+        if workers <= 1:
+            for pdf_path in pdf_paths:
+                try:
+                    yield pdf_path, _extract_pdf_chunks(pdf_path), None
+                except Exception as e:
+                    yield pdf_path, None, e
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_extract_pdf_chunks, pdf_path): pdf_path for pdf_path in pdf_paths}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+    
     def load_text_files(self, text_paths: List[str] = None) -> Dict[str, Any]:
         """Load text files into Qdrant."""
         if text_paths is None:
             # Auto-discover text files in current directory
-            text_files = secure_file_access.list_files(self.data_directory, ['.txt', '.md'])
-            text_paths = [file['path'] for file in text_files]
+            text_paths = self._discover_files(('.txt', '.md'))
         
         results = {
             "loaded": [],
             "failed": [],
             "total_files": len(text_paths)
         }
+        pending_points, pending_files = [], []
         
         for text_path in text_paths:
             try:
@@ -134,18 +391,17 @@ class DataLoader:
                     "version": "v1",
                     "file_size": text_data["metadata"].get("file_size", 0),
                     "line_count": text_data["metadata"].get("line_count", 0),
-                    "loaded_at": str(uuid.uuid4())
+                    "loaded_at": datetime.now().isoformat()
                 }
                 
-                # Load into Qdrant
-                self._load_text_to_qdrant(text_data["text"], metadata)
-                
-                results["loaded"].append({
+                # Chunk and embed; upload happens in bulk across files
+                pending_points.extend(self._embed_chunks(split_text(text_data["text"]), metadata))
+                pending_files.append({
                     "file": text_path,
                     "metadata": metadata
                 })
-                
-                logger.info(f"Successfully loaded {text_path}")
+                if len(pending_points) >= UPLOAD_FLUSH_POINTS:
+                    self._flush_points(pending_points, pending_files, results)
                 
             except Exception as e:
                 logger.error(f"Failed to load {text_path}: {str(e)}")
@@ -154,76 +410,92 @@ class DataLoader:
                     "error": str(e)
                 })
         
+        self._flush_points(pending_points, pending_files, results)
         logger.info(f"Text loading complete: {len(results['loaded'])} successful, {len(results['failed'])} failed")
         return results
     
-    def _load_text_to_qdrant(self, text: str, metadata: Dict[str, Any]):
-        """Load text content to Qdrant with chunking."""
+    def _embed_chunks(self, chunks: Iterable[str], metadata: Dict[str, Any]) -> List[Any]:
+        """
+        Embed chunks into Qdrant points (not yet uploaded).
+        
+        Chunks are embedded EMBED_BATCH_SIZE at a time as they are consumed, but
+        every point of the file is kept until the end because each payload
+        carries total_chunks; memory is therefore bounded per file, not per batch.
+        """
         try:
-            # Use the QdrantLoader's chunking and embedding
-            chunks = self.loader.splitter.split_text(text)
-            embeddings = self.loader.model.encode(chunks)
-            
+            from qdrant_client import models
+            source = metadata["source"]
             points = []
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                point_metadata = metadata.copy()
-                point_metadata.update({
-                    "text": chunk,
-                    "chunk_id": i,
-                    "total_chunks": len(chunks)
-                })
-                
-                points.append({
-                    "id": str(uuid.uuid4()),
-                    "vector": embedding.tolist(),
-                    "payload": point_metadata
-                })
+            pending: List[str] = []
             
-            # Insert into Qdrant
-            from qdrant_client import models
-            qdrant_points = [
-                models.PointStruct(
-                    id=point["id"],
-                    vector=point["vector"],
-                    payload=point["payload"]
+            def embed_pending():
+                embeddings = self.encoder.encode(
+                    pending,
+                    batch_size=EMBED_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
                 )
-                for point in points
-            ]
+                # PointStruct validates vectors as lists of floats, so convert the whole
+                # matrix in one C-level call rather than row by row
+                offset = len(points)
+                points.extend(
+                    models.PointStruct(
+                        id=_point_id(source, offset + i),
+                        vector=vector,
+                        payload={
+                            **metadata,
+                            "text": chunk,
+                            "chunk_id": offset + i
+                        }
+                    )
+                    for i, (chunk, vector) in enumerate(zip(pending, embeddings.tolist()))
+                )
+                pending.clear()
+            
+            for chunk in chunks:
+                pending.append(chunk)
+                if len(pending) >= EMBED_BATCH_SIZE:
+                    embed_pending()
+            if pending:
+                embed_pending()
             
-            self.loader.client.upsert(
+            for point in points:
+                point.payload["total_chunks"] = len(points)
+            return points
+            
+        except Exception as e:
+            logger.error(f"Failed to prepare text for Qdrant: {str(e)}")
+            raise
+    
+    def _flush_points(self, points: List[Any], files: List[Dict[str, Any]], results: Dict[str, Any]):
+        """Upload buffered points in bulk and record the outcome for their files."""
+        if not files:
+            return
+        
+        try:
+            self.loader.client.upload_points(
                 collection_name=self.collection_name,
-                points=qdrant_points
+                points=points,
+                batch_size=UPLOAD_BATCH_SIZE,
+                parallel=UPLOAD_PARALLEL
             )
-            
             logger.info(f"Loaded {len(points)} chunks to Qdrant")
             
+            results["loaded"].extend(files)
+            for loaded in files:
+                logger.info(f"Successfully loaded {loaded['file']}")
+                
         except Exception as e:
-            logger.error(f"Failed to load text to Qdrant: {str(e)}")
-            raise
+            logger.error(f"Failed to upload {len(points)} chunks to Qdrant: {str(e)}")
+            results["failed"].extend({"file": f["file"], "error": str(e)} for f in files)
+        
+        points.clear()
+        files.clear()
     
     def _extract_book_name(self, file_name: str) -> str:
         """Extract book name from file name."""
-        # Simple heuristic to extract book names
-        file_name_lower = file_name.lower()
-        
-        vedic_books = {
-            "rigveda": "rigveda",
-            "samaveda": "samaveda", 
-            "yajurveda": "yajurveda",
-            "atharvaveda": "atharvaveda",
-            "bhagavad": "bhagavad_gita",
-            "gita": "bhagavad_gita",
-            "upanishad": "upanishads",
-            "purana": "puranas",
-            "ramayana": "ramayana",
-            "mahabharata": "mahabharata"
-        }
-        
-        for key, book in vedic_books.items():
-            if key in file_name_lower:
-                return book
-        
-        return file_name  # Default to file name
+        return _book_name_for(file_name)
     
     def check_qdrant_status(self) -> Dict[str, Any]:
         """Check Qdrant connection and collection status."""
@@ -472,12 +472,12 @@ from agents.agent_memory_handler import agent_memory_handler
 from utils.mongo_logger import mongo_logger
 import uuid
 import importlib
-import requests
 import motor.motor_asyncio
 from config.settings import MONGO_CONFIG, TIMEOUT_CONFIG
 import shutil
 import os
 from tempfile import NamedTemporaryFile
+from concurrent.futures import ThreadPoolExecutor
 
 logger = get_logger(__name__)
 app = FastAPI(title="BHIV Core MCP Bridge", version="2.0.0")
@@ -486,11 +486,28 @@ rl_context = RLContext()
 # Initialize Agent Orchestrator for intelligent routing
 agent_orchestrator = AgentOrchestrator()
 
+# Blocking agent work runs here so slow tasks don't stall the event loop
+AGENT_WORKERS = int(os.getenv("MCP_AGENT_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+agent_pool = ThreadPoolExecutor(max_workers=AGENT_WORKERS, thread_name_prefix="mcp-agent")
+
 # Async MongoDB client
 mongo_client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_CONFIG['uri'])
 mongo_db = mongo_client[MONGO_CONFIG['database']]
 mongo_collection = mongo_db[MONGO_CONFIG['collection']]
 
+# Task logs are queued by the handlers and written in batches by mongo_writer
+LOG_BATCH_SIZE = int(os.getenv("MCP_LOG_BATCH_SIZE", "32"))
+LOG_FLUSH_INTERVAL = float(os.getenv("MCP_LOG_FLUSH_INTERVAL", "0.05"))  # seconds
+log_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+_log_writer_task: Optional[asyncio.Task] = None
+
+# Opt-in fire-and-forget (w=0) writes for the task-log path
+if os.getenv("MCP_LOG_UNACKNOWLEDGED", "false").lower() == "true":
+    from pymongo import WriteConcern
+    mongo_log_collection = mongo_collection.with_options(write_concern=WriteConcern(w=0))
+else:
+    mongo_log_collection = mongo_collection
+
 # Health check data
 health_status = {
     "startup_time": datetime.now(),
@@ -500,6 +517,132 @@ health_status = {
     "agent_status": {}
 }
 
+def enqueue_task_log(task_log_data: Dict[str, Any]):
+    """Hand a task log to the background writer without waiting on MongoDB."""
+    try:
+        log_queue.put_nowait(task_log_data)
+    except asyncio.QueueFull:
+        logger.warning(f"[MCP_BRIDGE] Task log queue full, dropping log for {task_log_data.get('task_id')}")
+
+async def _flush_task_logs(batch: List[Dict[str, Any]]):
+    """Write one batch of task logs with a single insert_many."""
+    try:
+        await mongo_log_collection.insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.error(f"[MCP_BRIDGE] Failed to write {len(batch)} task logs: {str(e)}")
+    await asyncio.gather(*(mongo_logger.log_task_execution(d) for d in batch))
+
+async def mongo_writer():
+    """Drain the log queue in batches of LOG_BATCH_SIZE or every LOG_FLUSH_INTERVAL."""
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await log_queue.get()
+        if item is None:
+            return
+        batch = [item]
+        stop = False
+        deadline = loop.time() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(log_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        await _flush_task_logs(batch)
+        if stop:
+            return
+
+@app.on_event("startup")
+async def start_log_writer():
+    """Start the background task-log writer."""
+    global _log_writer_task
+    _log_writer_task = asyncio.create_task(mongo_writer())
+
+@app.on_event("shutdown")
+async def stop_log_writer():
+    """Flush queued task logs before the process exits."""
+    if _log_writer_task is not None and not _log_writer_task.done():
+        await log_queue.put(None)
+        await _log_writer_task
+
+@app.on_event("shutdown")
+async def stop_agent_pool():
+    """Stop the agent worker threads."""
+    agent_pool.shutdown(wait=False, cancel_futures=True)
+
+async def run_orchestrator(query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the blocking orchestrator pipeline on the agent thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(agent_pool, agent_orchestrator.process_query, query, context)
+
+# Agent classes resolved from registry configs, and instances of stateless agents
+_agent_class_cache: Dict[tuple, type] = {}
+_agent_instance_cache: Dict[str, Any] = {}
+
+def _get_agent_class(module_path: str, class_name: str) -> type:
+    """Import an agent class once and reuse it for later requests."""
+    key = (module_path, class_name)
+    agent_class = _agent_class_cache.get(key)
+    if agent_class is None:
+        agent_class = getattr(importlib.import_module(module_path), class_name)
+        _agent_class_cache[key] = agent_class
+    return agent_class
+
+def get_agent_instance(agent_id: str):
+    """Instantiate a python_module agent, reusing it when its config marks it stateless."""
+    agent = _agent_instance_cache.get(agent_id)
+    if agent is not None:
+        return agent
+
+    agent_config = agent_registry.get_agent_config(agent_id)
+    if not agent_config or agent_config.get('connection_type') != 'python_module':
+        raise ValueError(f"Agent {agent_id} is not a python_module agent")
+
+    agent = _get_agent_class(agent_config['module_path'], agent_config['class_name'])()
+    if agent_config.get('stateless', False):
+        _agent_instance_cache[agent_id] = agent
+    return agent
+
+def clear_agent_caches():
+    """Forget cached agent classes and instances (after a config reload)."""
+    _agent_class_cache.clear()
+    _agent_instance_cache.clear()
+
+# Input types whose agent is fixed, so the orchestrator can be skipped
+FAST_ROUTE = {
+    "image": "image_agent",
+    "audio": "audio_agent",
+    "pdf": "archive_agent"
+}
+
+async def run_agent(agent_id: str, payload: "TaskPayload", task_id: str) -> Dict[str, Any]:
+    """Run a registry agent directly on the agent thread pool."""
+    agent = get_agent_instance(agent_id)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        agent_pool, agent.run, payload.pdf_path or payload.input, "", payload.agent, payload.input_type, task_id
+    )
+
+# Short-lived cache so frequent /health and /metrics probes share one MongoDB round trip
+MONGO_STATS_TTL = 5.0  # seconds
+_stats_cache: Dict[str, tuple] = {}
+
+async def _cached(key: str, ttl: float, coro_factory):
+    """Return the cached result for key, refreshing it via coro_factory after ttl seconds."""
+    value, expires = _stats_cache.get(key, (None, 0.0))
+    now = time.monotonic()
+    if now < expires:
+        return value
+    value = await coro_factory()
+    _stats_cache[key] = (value, now + ttl)
+    return value
+
 class TaskPayload(BaseModel):
     agent: str
     input: str
@@ -539,28 +682,36 @@ async def handle_task_request(payload: TaskPayload) -> dict:
 
     agent_id = None  # Initialize agent_id to avoid UnboundLocalError
     try:
-        # Use AgentOrchestrator for intelligent routing and intent classification
-        print(f"🎭 [AGENT ORCHESTRATOR] Processing query through orchestrator...")
-
-        # Prepare context for orchestrator
-        orchestrator_context = {
-            "query": payload.input,
-            "requested_agent": payload.agent,
-            "input_type": payload.input_type,
-            "tags": payload.tags,
-            "task_id": task_id,
-            "file_path": payload.pdf_path
-        }
-
-        # Process through orchestrator
-        orchestrator_result = agent_orchestrator.process_query(payload.input, orchestrator_context)
-
-        # Use the orchestrator result directly (it already contains all metadata)
-        result = orchestrator_result
-        agent_id = orchestrator_result.get("agent", payload.agent)
-        detected_intent = orchestrator_result.get("detected_intent", "unknown")
-        agent_logs = orchestrator_result.get("agent_logs", [])
-        processing_details = orchestrator_result.get("processing_details", {})
+        fast_agent = FAST_ROUTE.get(payload.input_type)
+        if fast_agent and not payload.tags and agent_registry.is_agent_available(fast_agent):
+            # File-typed inputs have a fixed agent, so skip intent classification
+            print(f"⚡ [FAST ROUTE] {payload.input_type} -> {fast_agent}")
+            agent_id = fast_agent
+            result = await run_agent(agent_id, payload, task_id)
+            detected_intent = payload.input_type
+            agent_logs = []
+        else:
+            # Use AgentOrchestrator for intelligent routing and intent classification
+            print(f"🎭 [AGENT ORCHESTRATOR] Processing query through orchestrator...")
+
+            # Prepare context for orchestrator
+            orchestrator_context = {
+                "query": payload.input,
+                "requested_agent": payload.agent,
+                "input_type": payload.input_type,
+                "tags": payload.tags,
+                "task_id": task_id,
+                "file_path": payload.pdf_path
+            }
+
+            # Process through orchestrator
+            orchestrator_result = await run_orchestrator(payload.input, orchestrator_context)
+
+            # Use the orchestrator result directly (it already contains all metadata)
+            result = orchestrator_result
+            agent_id = orchestrator_result.get("agent", payload.agent)
+            detected_intent = orchestrator_result.get("detected_intent", "unknown")
+            agent_logs = orchestrator_result.get("agent_logs", [])
 
         print(f"🎯 [INTENT DETECTED] {detected_intent}")
         print(f"🤖 [AGENT SELECTED] {agent_id}")
@@ -593,8 +744,7 @@ async def handle_task_request(payload: TaskPayload) -> dict:
             "processing_time": processing_time,
             "success": result.get('status', 500) == 200
         }
-        await mongo_collection.insert_one(task_log_data)
-        await mongo_logger.log_task_execution(task_log_data)
+        enqueue_task_log(task_log_data)
 
         # Log token/cost data
         if 'tokens_used' in result or 'cost_estimate' in result:
@@ -659,6 +809,24 @@ async def handle_task(payload: TaskPayload):
     """Handle task via JSON payload."""
     return await handle_task_request(payload)
 
+def _persist_upload(file: UploadFile) -> str:
+    """Copy an upload to a temp file (blocking; run via asyncio.to_thread)."""
+    with NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
+        try:
+            shutil.copyfileobj(file.file, temp_file, 1024 * 1024)
+        except BaseException:
+            temp_file.close()
+            _remove_upload(temp_file.name)
+            raise
+    return temp_file.name
+
+def _remove_upload(path: str):
+    """Delete a temp upload if it still exists."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
 @app.post("/handle_task_with_file")
 async def handle_task_with_file(
     agent: str = Form(...),
@@ -675,9 +843,7 @@ async def handle_task_with_file(
     
     try:
         if file:
-            with NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-                temp_file_path = temp_file.name
-                shutil.copyfileobj(file.file, temp_file)
+            temp_file_path = await asyncio.to_thread(_persist_upload, file)
             
             logger.info(f"[MCP_BRIDGE] Task ID: {task_id} | File uploaded: {file.filename} -> {temp_file_path}")
         
@@ -695,8 +861,8 @@ async def handle_task_with_file(
         result = await handle_task_request(payload)
         return result
     finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+        if temp_file_path:
+            await asyncio.to_thread(_remove_upload, temp_file_path)
 
 @app.post("/query-kb")
 async def query_knowledge_base(payload: QueryPayload):
@@ -717,7 +883,7 @@ async def query_knowledge_base(payload: QueryPayload):
             "filters": payload.filters
         }
 
-        orchestrator_result = agent_orchestrator.process_query(payload.query, orchestrator_context)
+        orchestrator_result = await run_orchestrator(payload.query, orchestrator_context)
         result = orchestrator_result.get("response", {})
         agent_id = orchestrator_result.get("agent", "knowledge_agent")
         detected_intent = orchestrator_result.get("detected_intent", "semantic_search")
@@ -748,8 +914,7 @@ async def query_knowledge_base(payload: QueryPayload):
             "processing_time": processing_time,
             "success": result.get('status', 500) == 200
         }
-        await mongo_collection.insert_one(task_log_data)
-        await mongo_logger.log_task_execution(task_log_data)
+        enqueue_task_log(task_log_data)
 
         # Add to agent memory
         memory_entry = {
@@ -857,7 +1022,7 @@ async def submit_feedback(feedback: FeedbackPayload):
 async def health_check():
     """Comprehensive health check endpoint."""
     try:
-        await mongo_client.admin.command('ping')
+        await _cached("ping", MONGO_STATS_TTL, lambda: mongo_client.admin.command('ping'))
         mongodb_status = "healthy"
     except Exception as e:
         logger.error(f"MongoDB health check failed: {str(e)}")
@@ -919,6 +1084,7 @@ async def reload_config():
         from agents.agent_registry import agent_registry as new_registry
         global agent_registry
         agent_registry = new_registry
+        clear_agent_caches()
         logger.info("Agent configuration reloaded successfully")
         return {
             "status": "success",
@@ -930,6 +1096,73 @@ async def reload_config():
         logger.error(f"Error reloading config: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to reload config: {str(e)}")
 
+# Expire task logs after this many seconds (0 keeps them forever)
+TASK_LOG_TTL_SECONDS = int(os.getenv("MCP_TASK_LOG_TTL_SECONDS", "0"))
+
+# Reduce the last METRICS_WINDOW task logs inside MongoDB instead of in Python
+METRICS_WINDOW = 100
+METRICS_PIPELINE = [
+    {"$sort": {"timestamp": -1}},
+    {"$limit": METRICS_WINDOW},
+    {"$facet": {
+        "summary": [
+            {"$group": {
+                "_id": None,
+                "avg_time": {"$avg": {"$ifNull": ["$processing_time", "$output.processing_time"]}},
+                "count": {"$sum": 1}
+            }}
+        ],
+        "agents": [
+            {"$match": {"output": {"$type": "object"}}},
+            {"$group": {"_id": {"$ifNull": ["$agent", "unknown"]}, "n": {"$sum": 1}}}
+        ]
+    }}
+]
+
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the metrics index and, if configured, the task-log TTL index."""
+    try:
+        await mongo_collection.create_index([("timestamp", -1), ("agent", 1)])
+        if TASK_LOG_TTL_SECONDS > 0:
+            await mongo_collection.create_index([("timestamp", 1)], expireAfterSeconds=TASK_LOG_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not create MongoDB indexes: {str(e)}")
+
+@app.get("/metrics")
+async def get_metrics():
+    """Get detailed system metrics."""
+    try:
+        # Get MongoDB stats
+        db_stats = await _cached("dbStats", MONGO_STATS_TTL, lambda: mongo_db.command("dbStats"))
+        collection_stats = await _cached(
+            "document_count", MONGO_STATS_TTL, mongo_collection.estimated_document_count
+        )
+
+        # Aggregate recent task performance server-side
+        agg = await mongo_collection.aggregate(METRICS_PIPELINE).to_list(1)
+        facets = agg[0] if agg else {"summary": [], "agents": []}
+        summary = facets["summary"][0] if facets["summary"] else {}
+        agent_usage = {row["_id"]: row["n"] for row in facets["agents"]}
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "database": {
+                "total_documents": collection_stats,
+                "database_size_mb": round(db_stats.get("dataSize", 0) / 1024 / 1024, 2),
+                "storage_size_mb": round(db_stats.get("storageSize", 0) / 1024 / 1024, 2)
+            },
+            "performance": {
+                "avg_processing_time_seconds": round(summary.get("avg_time") or 0, 3),
+                "total_tasks_processed": summary.get("count", 0),
+                "agent_usage": agent_usage
+            },
+            "system": health_status
+        }
+    except Exception as e:
+        logger.error(f"Error getting metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/handle_multi_task")
 async def handle_multi_task(request: dict):
     """Handle multiple files/inputs asynchronously for improved performance."""
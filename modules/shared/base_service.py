@@ -13,7 +13,7 @@ Common functionality and patterns for all microservices including:
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
@@ -256,6 +256,11 @@ class ServiceRegistry:
         }
         logger.info(f"📋 Registered service: {name} at {host}:{port}")
     
+    def register_services(self, services: List[Tuple[str, str, int]], health_endpoint: str = "/health"):
+        """Register several (name, host, port) services at once"""
+        for name, host, port in services:
+            self.register_service(name, host, port, health_endpoint)
+    
     def get_service(self, name: str) -> Optional[Dict]:
         """Get service information"""
         return self.services.get(name)
@@ -8,6 +8,10 @@ JWT-based authentication and RBAC for BHIV Core services.
 import os
 import jwt
 import bcrypt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, Depends, Header
@@ -21,6 +25,11 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "bhiv_core_secret_key_2024")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
 
+# Verified token cache (~4500 entries, ~200KB)
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "4500"))
+_token_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
@@ -98,6 +107,34 @@ def verify_token(token: str) -> Dict[str, Any]:
         logger.error(f"❌ Token verification error: {e}")
         raise HTTPException(status_code=401, detail="Token verification failed")
 
+def verify_token_cached(token: str) -> Dict[str, Any]:
+    """Verify JWT token, reusing the decoded payload until the token expires"""
+    key = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+    
+    with _token_cache_lock:
+        user_info = _token_cache.get(key)
+        if user_info is not None:
+            if user_info["exp"] > time.time():
+                _token_cache.move_to_end(key)
+                return dict(user_info)
+            del _token_cache[key]
+    
+    # Cache miss - full signature verification (raises on invalid tokens)
+    user_info = verify_token(token)
+    
+    if user_info.get("exp") is not None:
+        with _token_cache_lock:
+            _token_cache[key] = user_info
+            if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+                _token_cache.popitem(last=False)
+    
+    return dict(user_info)
+
+def clear_token_cache():
+    """Drop all cached token verifications (e.g. after secret or RBAC changes)"""
+    with _token_cache_lock:
+        _token_cache.clear()
+
 def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     """Authenticate user with username and password"""
     try:
@@ -130,7 +167,7 @@ def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depen
         return None
     
     try:
-        return verify_token(credentials.credentials)
+        return verify_token_cached(credentials.credentials)
     except HTTPException:
         return None
 
@@ -139,7 +176,7 @@ def require_auth(credentials: HTTPAuthorizationCredentials = Depends(security))
     if not credentials:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    return verify_token(credentials.credentials)
+    return verify_token_cached(credentials.credentials)
 
 def require_role(required_role: str):
     """Decorator to require specific role"""
@@ -20,7 +20,7 @@ import asyncio
 import ipaddress
 from .models import User, SecurityEvent, ThreatLevel
 from .database import DatabaseTransaction
-from .auth import verify_token, TokenData
+from .auth import verify_token_cached, TokenData
 import re
 
 logger = logging.getLogger(__name__)
@@ -343,7 +343,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         
         try:
             # Verify token
-            token_data = verify_token(token)
+            token_data = verify_token_cached(token)
             return token_data
             
         except HTTPException as e:
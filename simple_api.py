@@ -20,6 +20,7 @@ import time
 import requests
 import json
 from utils.logger import get_logger
+from integrations.gurukul_bridge import add_kb_timestamp_header
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -258,8 +259,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-KB-Timestamp"],
 )
 
+# KB responses carry their timestamp in a header instead of the JSON payload
+add_kb_timestamp_header(app)
+
 # Initialize enhanced agent registry if in production mode
 enhanced_agent_registry = None
 if production_mode:
@@ -515,6 +520,12 @@ def get_nas_kb():
         from bhiv_knowledge_base import BHIVKnowledgeBase
         nas_path = os.getenv("NAS_PATH", r"\\192.168.0.94\Guruukul_DB")
         nas_kb = BHIVKnowledgeBase(nas_path, use_qdrant=True)  # Enable Qdrant
+        try:
+            # Long-running server: revalidate the NAS index in the background
+            # instead of on the request path
+            nas_kb.nas_manager.start_index_refresher()
+        except Exception as e:
+            logger.warning(f"⚠️ NAS index refresher not started: {e}")
         logger.info("✅ NAS Knowledge Base initialized for API with Qdrant")
     return nas_kb
 
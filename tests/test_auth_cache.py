@@ -0,0 +1,121 @@
+"""
+Tests for verify_token_cached: reuse until expiry, LRU eviction, and that
+invalid tokens are never cached.
+"""
+
+import time
+
+import pytest
+
+auth = pytest.importorskip("security.auth")
+from fastapi import HTTPException
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    auth.clear_token_cache()
+    yield
+    auth.clear_token_cache()
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Count full signature verifications behind the cache"""
+    calls = []
+    verify_token = auth.verify_token
+
+    def counting_verify(token):
+        calls.append(token)
+        return verify_token(token)
+
+    monkeypatch.setattr(auth, "verify_token", counting_verify)
+    return calls
+
+
+def make_token(username="alice", exp=None):
+    payload = {
+        "sub": username,
+        "role": auth.UserRole.ADMIN,
+        "permissions": ["read"],
+        "iat": int(time.time()),
+        "exp": exp if exp is not None else int(time.time()) + 3600,
+    }
+    return auth.jwt.encode(payload, auth.JWT_SECRET_KEY, algorithm=auth.JWT_ALGORITHM)
+
+
+def test_repeated_token_is_verified_once(decode_calls):
+    token = make_token()
+
+    first = auth.verify_token_cached(token)
+    second = auth.verify_token_cached(token)
+
+    assert first == second
+    assert first["username"] == "alice"
+    assert decode_calls == [token]
+
+
+def test_callers_get_copies_of_the_cached_entry(decode_calls):
+    token = make_token()
+
+    auth.verify_token_cached(token)["role"] = "tampered"
+
+    assert auth.verify_token_cached(token)["role"] == auth.UserRole.ADMIN
+
+
+def test_expired_cache_entry_is_reverified(monkeypatch, decode_calls):
+    now = time.time()
+    token = make_token(exp=int(now) + 60)
+    auth.verify_token_cached(token)
+
+    # Past the token's own expiry the cached entry is dropped and the
+    # full verification rejects it
+    monkeypatch.setattr(auth.time, "time", lambda: now + 120)
+    monkeypatch.setattr(auth.jwt, "decode", _expired_decode)
+    with pytest.raises(HTTPException) as excinfo:
+        auth.verify_token_cached(token)
+
+    assert excinfo.value.status_code == 401
+    assert len(decode_calls) == 2
+    assert len(auth._token_cache) == 0
+
+
+def _expired_decode(*args, **kwargs):
+    raise auth.jwt.ExpiredSignatureError("Signature has expired")
+
+
+def test_invalid_token_is_not_cached(decode_calls):
+    with pytest.raises(HTTPException):
+        auth.verify_token_cached("not-a-jwt")
+    with pytest.raises(HTTPException):
+        auth.verify_token_cached("not-a-jwt")
+
+    assert len(decode_calls) == 2
+    assert len(auth._token_cache) == 0
+
+
+def test_least_recently_used_token_is_evicted(monkeypatch, decode_calls):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_MAX_SIZE", 2)
+    a, b, c = (make_token(name) for name in ("a", "b", "c"))
+
+    auth.verify_token_cached(a)
+    auth.verify_token_cached(b)
+    auth.verify_token_cached(a)  # refresh a, so b is now the oldest
+    auth.verify_token_cached(c)
+
+    assert len(auth._token_cache) == 2
+    decode_calls.clear()
+    auth.verify_token_cached(a)
+    auth.verify_token_cached(c)
+    assert decode_calls == []
+    auth.verify_token_cached(b)
+    assert decode_calls == [b]
+
+
+def test_clear_token_cache_forces_reverification(decode_calls):
+    token = make_token()
+    auth.verify_token_cached(token)
+
+    auth.clear_token_cache()
+    auth.verify_token_cached(token)
+
+    assert decode_calls == [token, token]
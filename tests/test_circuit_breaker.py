@@ -0,0 +1,154 @@
+"""
+Tests for the per-host circuit breaker and how the Gurukul bridge feeds it
+HTTP statuses and exhausted retries.
+"""
+
+import pytest
+
+gurukul_bridge = pytest.importorskip("integrations.gurukul_bridge")
+requests = pytest.importorskip("requests")
+
+API_URL = "http://kb.test:8004"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"{}"):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+
+
+class FakeSession:
+    """Returns the queued outcomes in order; exceptions are raised"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(gurukul_bridge.time, "monotonic", clock)
+    gurukul_bridge._CIRCUIT_BREAKERS.clear()
+    gurukul_bridge.clear_kb_cache()
+    yield clock
+    gurukul_bridge._CIRCUIT_BREAKERS.clear()
+    gurukul_bridge.clear_kb_cache()
+
+
+def make_bridge(outcomes):
+    bridge = gurukul_bridge.GurukulKnowledgeBridge(API_URL)
+    bridge.session = FakeSession(outcomes)
+    return bridge
+
+
+def test_breakers_are_shared_per_host():
+    a = gurukul_bridge.get_circuit_breaker("http://kb.test:8004/query-kb")
+    b = gurukul_bridge.get_circuit_breaker("http://kb.test:8004/health")
+    c = gurukul_bridge.get_circuit_breaker("http://other.test:8004/query-kb")
+
+    assert a is b
+    assert a is not c
+
+
+def test_opens_after_threshold_failures_within_window():
+    breaker = gurukul_bridge.get_circuit_breaker(API_URL)
+
+    for _ in range(gurukul_bridge.CB_FAILURE_THRESHOLD - 1):
+        breaker.on_failure()
+    assert not breaker.is_open()
+
+    breaker.on_failure()
+    assert breaker.state == "open"
+    assert breaker.is_open()
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_failures_outside_the_window_do_not_accumulate(isolated):
+    breaker = gurukul_bridge.get_circuit_breaker(API_URL)
+
+    for _ in range(gurukul_bridge.CB_FAILURE_THRESHOLD - 1):
+        breaker.on_failure()
+    isolated.now += gurukul_bridge.CB_FAILURE_WINDOW + 1
+    breaker.on_failure()
+
+    assert breaker.state == "closed"
+    assert breaker.fail_count == 1
+
+
+def test_half_open_probe_closes_on_success_and_reopens_on_failure(isolated):
+    breaker = gurukul_bridge.get_circuit_breaker(API_URL)
+    for _ in range(gurukul_bridge.CB_FAILURE_THRESHOLD):
+        breaker.on_failure()
+
+    isolated.now += gurukul_bridge.CB_RESET_TIMEOUT
+    assert not breaker.is_open()
+    assert breaker.state == "half_open"
+    breaker.on_failure()
+    assert breaker.state == "open"
+
+    isolated.now += gurukul_bridge.CB_RESET_TIMEOUT
+    assert not breaker.is_open()
+    breaker.on_success()
+    assert breaker.state == "closed"
+    assert breaker.fail_count == 0
+
+
+@pytest.mark.parametrize("status, fail_count", [(200, 0), (204, 0), (404, 1), (500, 2), (503, 2)])
+def test_on_response_counts_only_5xx_as_failures(status, fail_count):
+    breaker = gurukul_bridge.get_circuit_breaker(API_URL)
+    breaker.on_failure()
+
+    breaker.on_response(status)
+
+    assert breaker.fail_count == fail_count
+
+
+def test_5xx_responses_open_the_breaker_and_short_circuit_calls():
+    threshold = gurukul_bridge.CB_FAILURE_THRESHOLD
+    bridge = make_bridge([FakeResponse(500) for _ in range(threshold)])
+
+    for i in range(threshold):
+        result = bridge.call_knowledge_base(f"query {i}")
+        assert result["success"] is False
+
+    result = bridge.call_knowledge_base("one more")
+    assert bridge.session.calls == threshold
+    assert "circuit open" in result["error"]
+
+
+def test_exhausted_retries_count_as_failures():
+    threshold = gurukul_bridge.CB_FAILURE_THRESHOLD
+    bridge = make_bridge([requests.exceptions.RetryError("max retries") for _ in range(threshold)])
+
+    for i in range(threshold):
+        bridge.call_knowledge_base(f"query {i}")
+
+    assert bridge._breaker.state == "open"
+
+
+def test_success_resets_the_failure_count():
+    body = b'{"response": "ok", "sources": []}'
+    bridge = make_bridge([FakeResponse(502), FakeResponse(200, body)])
+
+    bridge.call_knowledge_base("first")
+    result = bridge.call_knowledge_base("second")
+
+    assert result["success"] is True
+    assert bridge._breaker.fail_count == 0
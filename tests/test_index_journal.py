@@ -0,0 +1,154 @@
+"""
+Tests for the knowledge base index: the append-only JSONL journal, its
+replay on load, and compaction back into index.json from disk.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+import knowledge_base_manager as kbm
+from knowledge_base_manager import NASKnowledgeBaseManager
+
+
+def make_manager(root) -> NASKnowledgeBaseManager:
+    manager = NASKnowledgeBaseManager(str(root))
+    manager._ensure_directories()
+    return manager
+
+
+def put(manager, document_id, **meta):
+    manager._update_index(document_id, {"document_id": document_id, **meta})
+
+
+def journal_lines(manager):
+    return [json.loads(line) for line in manager.index_journal.read_bytes().splitlines()]
+
+
+def test_updates_are_appended_to_the_journal(tmp_path):
+    manager = make_manager(tmp_path)
+
+    put(manager, "a", size=1)
+    put(manager, "b", size=2)
+    manager._remove_from_index("a")
+
+    assert journal_lines(manager) == [
+        {"op": "put", "id": "a", "meta": {"document_id": "a", "size": 1}},
+        {"op": "put", "id": "b", "meta": {"document_id": "b", "size": 2}},
+        {"op": "del", "id": "a"},
+    ]
+    assert not manager.index_file.exists()
+    assert set(manager._load_index()) == {"b"}
+
+
+def test_fresh_manager_replays_index_and_journal(tmp_path):
+    writer = make_manager(tmp_path)
+    put(writer, "a")
+    writer._compact_index()
+    put(writer, "b")
+    writer._remove_from_index("a")
+
+    reader = make_manager(tmp_path)
+
+    assert set(reader._load_index()) == {"b"}
+    assert reader._journal_entries == 2
+
+
+def test_delete_is_journaled_even_if_not_in_local_view(tmp_path):
+    stale = make_manager(tmp_path)
+    stale._load_index()
+    put(make_manager(tmp_path), "a")
+
+    stale._remove_from_index("a")
+
+    assert set(make_manager(tmp_path)._load_index()) == set()
+
+
+def test_torn_trailing_line_is_skipped_and_folded_away(tmp_path):
+    manager = make_manager(tmp_path)
+    put(manager, "a")
+    with open(manager.index_journal, "ab") as journal:
+        journal.write(b'{"op": "put", "id": "b", "me')
+
+    reader = make_manager(tmp_path)
+
+    assert set(reader._load_index()) == {"a"}
+    # Loading a torn journal compacts it so the next append starts on a fresh line
+    assert not reader.index_journal.exists()
+    put(reader, "c")
+    assert set(make_manager(tmp_path)._load_index()) == {"a", "c"}
+
+
+def test_compaction_reaches_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(kbm, "INDEX_COMPACT_THRESHOLD", 3)
+    manager = make_manager(tmp_path)
+
+    for document_id in "abc":
+        put(manager, document_id)
+
+    assert not manager.index_journal.exists()
+    assert manager._journal_entries == 0
+    documents = json.loads(manager.index_file.read_bytes())["documents"]
+    assert set(documents) == {"a", "b", "c"}
+
+
+def test_compaction_keeps_entries_missing_from_the_cached_view(tmp_path):
+    first = make_manager(tmp_path)
+    first._load_index()
+    # Another process appends after `first` last looked at the files
+    put(make_manager(tmp_path), "other")
+
+    put(first, "mine")
+    first._compact_index()
+
+    documents = json.loads(first.index_file.read_bytes())["documents"]
+    assert set(documents) == {"mine", "other"}
+    assert set(first._load_index()) == {"mine", "other"}
+
+
+def test_compaction_leaves_no_journals_behind(tmp_path):
+    manager = make_manager(tmp_path)
+    put(manager, "a")
+
+    manager._compact_index()
+
+    assert manager._aside_journals() == []
+    assert not manager.index_journal.exists()
+
+
+def test_aside_journal_from_interrupted_compaction_is_replayed(tmp_path):
+    manager = make_manager(tmp_path)
+    put(manager, "a")
+    aside = tmp_path / "knowledge_base" / f"index.jsonl.{time.time_ns()}.{os.getpid()}.compact"
+    os.replace(manager.index_journal, aside)
+    put(manager, "b")
+
+    assert set(make_manager(tmp_path)._load_index()) == {"a", "b"}
+
+
+def test_compaction_removes_only_stale_aside_journals(tmp_path):
+    manager = make_manager(tmp_path)
+    kb_path = tmp_path / "knowledge_base"
+    stale_ns = time.time_ns() - int((kbm.INDEX_ASIDE_STALE_AFTER + 60) * 1e9)
+    stale = kb_path / f"index.jsonl.{stale_ns}.1.compact"
+    recent = kb_path / f"index.jsonl.{time.time_ns()}.1.compact"
+    for aside, document_id in ((stale, "old"), (recent, "new")):
+        aside.write_bytes(json.dumps({"op": "put", "id": document_id, "meta": {}}).encode() + b"\n")
+
+    manager._compact_index()
+
+    assert not stale.exists()
+    assert recent.exists()
+    documents = json.loads(manager.index_file.read_bytes())["documents"]
+    assert set(documents) == {"old", "new"}
+
+
+def test_list_documents_returns_copies(tmp_path):
+    manager = make_manager(tmp_path)
+    put(manager, "a", size=1)
+
+    manager.list_documents()[0]["size"] = 99
+
+    assert manager._load_index()["a"]["size"] == 1
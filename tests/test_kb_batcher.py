@@ -0,0 +1,171 @@
+"""
+Tests for KBBatcher: coalescing concurrent /query-kb calls and the
+fallback to single calls when the server has no batch endpoint.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+gbi = pytest.importorskip("integrations.gurukul_backend_integration")
+from integrations import gurukul_bridge
+
+API_URL = "http://kb.test:8001"
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self._raw = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.content_length = len(self._raw)
+
+    async def read(self):
+        return self._raw
+
+    async def text(self):
+        return self._raw.decode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Records every POST and answers from a per-URL handler"""
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.calls = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        payload = json.loads(data)
+        self.calls.append((url, payload, timeout))
+        return FakeResponse(*self.handlers[url](payload))
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    gurukul_bridge._CIRCUIT_BREAKERS.clear()
+    yield
+    gurukul_bridge._CIRCUIT_BREAKERS.clear()
+
+
+def install_session(monkeypatch, handlers) -> FakeSession:
+    session = FakeSession(handlers)
+
+    async def get_session():
+        return session
+
+    monkeypatch.setattr(gbi, "get_session", get_session)
+    return session
+
+
+def echo_batch(payload):
+    return 200, {"results": [{"answer": q["query"]} for q in payload["queries"]]}
+
+
+def echo_single(payload):
+    return 200, {"answer": payload["query"]}
+
+
+async def submit_all(batcher, queries):
+    return await asyncio.gather(*(batcher.submit({"query": q}) for q in queries))
+
+
+def test_concurrent_queries_share_one_batch_request(monkeypatch):
+    session = install_session(monkeypatch, {f"{API_URL}/query-kb/batch": echo_batch})
+    batcher = gbi.KBBatcher(API_URL, max_batch_size=16, max_queue_time=0.01)
+
+    results = asyncio.run(submit_all(batcher, ["a", "b", "c"]))
+
+    assert [url for url, _, _ in session.calls] == [f"{API_URL}/query-kb/batch"]
+    assert session.calls[0][1] == {"queries": [{"query": "a"}, {"query": "b"}, {"query": "c"}]}
+    assert results == [(200, {"answer": "a"}), (200, {"answer": "b"}), (200, {"answer": "c"})]
+
+
+def test_full_batch_flushes_without_waiting(monkeypatch):
+    session = install_session(monkeypatch, {f"{API_URL}/query-kb/batch": echo_batch})
+    batcher = gbi.KBBatcher(API_URL, max_batch_size=2, max_queue_time=60.0)
+
+    results = asyncio.run(asyncio.wait_for(submit_all(batcher, ["a", "b", "c", "d"]), 5))
+
+    assert len(session.calls) == 2
+    assert [r[1]["answer"] for r in results] == ["a", "b", "c", "d"]
+
+
+def test_single_query_skips_the_batch_endpoint(monkeypatch):
+    session = install_session(monkeypatch, {f"{API_URL}/query-kb": echo_single})
+    batcher = gbi.KBBatcher(API_URL, max_queue_time=0.0)
+
+    results = asyncio.run(submit_all(batcher, ["only"]))
+
+    assert [url for url, _, _ in session.calls] == [f"{API_URL}/query-kb"]
+    assert results == [(200, {"answer": "only"})]
+
+
+@pytest.mark.parametrize("status", [404, 405])
+def test_missing_batch_endpoint_falls_back_to_single_calls(monkeypatch, status):
+    session = install_session(monkeypatch, {
+        f"{API_URL}/query-kb/batch": lambda payload: (status, "not found"),
+        f"{API_URL}/query-kb": echo_single,
+    })
+    batcher = gbi.KBBatcher(API_URL, max_queue_time=0.01)
+
+    async def scenario():
+        first = await submit_all(batcher, ["a", "b"])
+        second = await submit_all(batcher, ["c", "d"])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == [(200, {"answer": "a"}), (200, {"answer": "b"})]
+    assert second == [(200, {"answer": "c"}), (200, {"answer": "d"})]
+    assert not batcher._batch_supported
+    # The batch endpoint is probed once, then never again
+    urls = [url for url, _, _ in session.calls]
+    assert urls.count(f"{API_URL}/query-kb/batch") == 1
+    assert urls.count(f"{API_URL}/query-kb") == 4
+
+
+def test_result_count_mismatch_resends_queries_one_by_one(monkeypatch):
+    session = install_session(monkeypatch, {
+        f"{API_URL}/query-kb/batch": lambda payload: (200, {"results": [{"answer": "?"}]}),
+        f"{API_URL}/query-kb": echo_single,
+    })
+    batcher = gbi.KBBatcher(API_URL, max_queue_time=0.01)
+
+    results = asyncio.run(submit_all(batcher, ["a", "b"]))
+
+    assert results == [(200, {"answer": "a"}), (200, {"answer": "b"})]
+    # A malformed reply doesn't disable batching for later calls
+    assert batcher._batch_supported
+    assert len(session.calls) == 3
+
+
+def test_batch_error_is_delivered_to_every_caller(monkeypatch):
+    install_session(monkeypatch, {f"{API_URL}/query-kb/batch": lambda payload: (500, "boom")})
+    batcher = gbi.KBBatcher(API_URL, max_queue_time=0.01)
+
+    results = asyncio.run(submit_all(batcher, ["a", "b"]))
+
+    assert results == [(500, "boom"), (500, "boom")]
+
+
+def test_batch_uses_the_most_generous_caller_timeout(monkeypatch):
+    session = install_session(monkeypatch, {f"{API_URL}/query-kb/batch": echo_batch})
+    batcher = gbi.KBBatcher(API_URL, max_queue_time=0.01)
+    short = gbi.aiohttp.ClientTimeout(total=1)
+    long = gbi.aiohttp.ClientTimeout(total=90)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit({"query": "a"}, timeout=short),
+            batcher.submit({"query": "b"}, timeout=long),
+        )
+
+    asyncio.run(scenario())
+
+    assert session.calls[0][2] is long
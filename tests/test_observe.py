@@ -0,0 +1,140 @@
+"""
+Tests for the fused observe() instrumentation and the per-agent counters
+it feeds.
+"""
+
+import asyncio
+
+import pytest
+
+from integration._observe import observe
+
+
+class FakeMetrics:
+    def __init__(self):
+        self.operations = []
+
+    def record_business_operation(self, operation_type, duration, success):
+        self.operations.append((operation_type, success))
+
+
+class FakeSpan:
+    def __init__(self):
+        self.attributes = {}
+
+    def set_attributes(self, attrs):
+        self.attributes.update(attrs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeTracing:
+    def __init__(self):
+        self.spans = []
+        self.exceptions = []
+
+    def start_span(self, name):
+        span = FakeSpan()
+        self.spans.append((name, span))
+        return span
+
+    def record_exception(self, exception):
+        self.exceptions.append(exception)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_success_records_one_operation_and_one_span():
+    metrics, tracing = FakeMetrics(), FakeTracing()
+
+    async def scenario():
+        async with observe("agent.query", metrics, tracing, attrs={"agent": "a"}) as obs:
+            assert obs.elapsed() >= 0
+
+    run(scenario())
+
+    assert metrics.operations == [("agent.query", True)]
+    assert [(name, span.attributes) for name, span in tracing.spans] == [("agent.query", {"agent": "a"})]
+
+
+def test_exception_marks_failure_and_propagates():
+    metrics, tracing = FakeMetrics(), FakeTracing()
+    error = ValueError("boom")
+
+    async def scenario():
+        async with observe("agent.query", metrics, tracing):
+            raise error
+
+    with pytest.raises(ValueError):
+        run(scenario())
+
+    assert metrics.operations == [("agent.query", False)]
+    assert tracing.exceptions == [error]
+
+
+def test_explicit_fail_records_failure_without_raising():
+    metrics, tracing = FakeMetrics(), FakeTracing()
+    error = RuntimeError("agent returned an error")
+
+    async def scenario():
+        async with observe("agent.query", metrics, tracing) as obs:
+            obs.fail(error)
+
+    run(scenario())
+
+    assert metrics.operations == [("agent.query", False)]
+    assert tracing.exceptions == [error]
+
+
+def test_discard_skips_the_business_metric():
+    metrics = FakeMetrics()
+
+    async def scenario():
+        async with observe("agent.query", metrics) as obs:
+            obs.discard()
+
+    run(scenario())
+
+    assert metrics.operations == []
+
+
+def test_discard_still_skips_the_metric_when_the_block_raises():
+    metrics = FakeMetrics()
+
+    async def scenario():
+        async with observe("agent.query", metrics) as obs:
+            obs.discard()
+            raise PermissionError("rejected")
+
+    with pytest.raises(PermissionError):
+        run(scenario())
+
+    assert metrics.operations == []
+
+
+def test_works_without_metrics_or_tracing():
+    async def scenario():
+        async with observe("agent.query") as obs:
+            return obs.success
+
+    assert run(scenario()) is True
+
+
+def test_agent_stats_record_keeps_counts_and_running_mean():
+    agent_integration = pytest.importorskip("integration.agent_integration")
+    stats = agent_integration.AgentStats(description="test agent")
+
+    stats.record(True, 1.0, now=100.0)
+    stats.record(False, 3.0, now=200.0)
+    stats.record(True, 2.0, now=300.0)
+
+    assert (stats.total_queries, stats.successful_queries, stats.failed_queries) == (3, 2, 1)
+    assert stats.average_response_time == pytest.approx(2.0)
+    assert stats.last_used == 300.0
+    assert stats.to_dict()["last_used"] == "1970-01-01T00:05:00"
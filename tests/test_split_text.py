@@ -0,0 +1,102 @@
+"""
+Tests for the sliding-window chunker used when loading documents into Qdrant.
+"""
+
+import pytest
+
+loader = pytest.importorskip("load_data_to_qdrant")
+split_text = loader.split_text
+iter_chunks = loader.iter_chunks
+
+
+def words(n: int) -> str:
+    return " ".join(f"w{i:04d}" for i in range(n))
+
+
+def test_empty_and_whitespace_text_give_no_chunks():
+    assert split_text("") == []
+    assert split_text("   \n\n  ") == []
+
+
+def test_short_text_is_a_single_stripped_chunk():
+    assert split_text("  hello world \n") == ["hello world"]
+
+
+def test_chunks_respect_size_and_cut_on_word_boundaries():
+    text = words(500)
+    vocabulary = set(text.split())
+
+    chunks = split_text(text, chunk_size=100, chunk_overlap=20)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk) <= 100
+        assert set(chunk.split()) <= vocabulary
+
+
+def test_chunks_cover_the_whole_text_in_order():
+    text = words(500)
+
+    chunks = split_text(text, chunk_size=100, chunk_overlap=20)
+
+    assert chunks[0].startswith("w0000")
+    assert chunks[-1].endswith("w0499")
+    # Overlapping words repeat, but every word appears and in its original order
+    seen = dict.fromkeys(word for chunk in chunks for word in chunk.split())
+    assert list(seen) == text.split()
+
+
+def test_consecutive_chunks_overlap_without_splitting_words():
+    text = words(500)
+
+    chunks = split_text(text, chunk_size=100, chunk_overlap=20)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        first_word = current.split()[0]
+        assert first_word in previous.split()
+        # The overlap never exceeds chunk_overlap characters
+        overlap = previous[previous.index(first_word):]
+        assert current.startswith(overlap)
+        assert len(overlap) <= 20
+
+
+def test_zero_overlap_partitions_the_words():
+    text = words(300)
+
+    chunks = split_text(text, chunk_size=60, chunk_overlap=0)
+
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_text_without_spaces_is_cut_hard_at_chunk_size():
+    text = "x" * 250
+
+    chunks = split_text(text, chunk_size=100, chunk_overlap=10)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert chunks[0] == "x" * 100
+    assert chunks[-1].endswith("x")
+
+
+def test_newlines_count_as_break_points():
+    text = "\n".join(f"line{i:03d}" for i in range(100))
+
+    chunks = split_text(text, chunk_size=50, chunk_overlap=0)
+
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert "\n".join(chunks).split() == text.split()
+
+
+def test_iter_chunks_carries_the_tail_across_pieces():
+    pages = [words(60), words(60)]
+
+    chunks = list(iter_chunks(pages))
+
+    assert all(len(chunk) <= loader.CHUNK_SIZE for chunk in chunks)
+    joined = " ".join(chunks).split()
+    assert joined.count("w0059") >= 2  # last word of each page survives
+    assert chunks[-1].endswith("w0059")
+
+
+def test_iter_chunks_skips_empty_pieces():
+    assert list(iter_chunks(["", "hello", ""])) == ["hello"]
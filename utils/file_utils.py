@@ -2,7 +2,7 @@ import os
 import pdfplumber
 import mimetypes
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -126,6 +126,33 @@ class SecureFileAccess:
                 "error": str(e)
             }
 
+    def iter_pdf_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Yield the stripped text of each PDF page (empty string for pages
+        without text), one page at a time.
+        
+        Applies the same checks as read_pdf but raises instead of returning
+        an error dict, and never holds more than one page's text.
+        
+        Args:
+            pdf_path: Path to the PDF file
+        """
+        if not self._is_path_allowed(pdf_path):
+            raise PermissionError(f"Access denied: {pdf_path} is not in allowed paths")
+        
+        if not self._validate_file_type(pdf_path, ['.pdf']):
+            raise ValueError(f"Invalid file type: {pdf_path}")
+        
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"File not found: {pdf_path}")
+        
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                # Drop the page's parsed layout objects before moving on
+                page.flush_cache()
+                yield page_text.strip() if page_text else ""
+
     def read_text_file(self, file_path: str, encoding: str = 'utf-8') -> Dict[str, Any]:
         """
         Safely read a text file.
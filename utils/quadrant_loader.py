@@ -8,22 +8,32 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Stored vector precision; "float16" halves collection size (Qdrant >= 1.9)
+QDRANT_VECTOR_DATATYPE = os.getenv("QDRANT_VECTOR_DATATYPE", "float32").lower()
+
 class QdrantLoader:
     def __init__(self, qdrant_url="localhost:6333", collection_name="vedas_knowledge_base"):
         self.client = QdrantClient(qdrant_url, prefer_grpc=False)
         self.splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=50)
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")  # Matches 384-dim vectors
+        self._model = None
         self.collection_name = collection_name
 
+    @property
+    def model(self) -> SentenceTransformer:
+        """Embedding model, loaded on first use so other encoders don't pay for it."""
+        if self._model is None:
+            self._model = SentenceTransformer("all-MiniLM-L6-v2")  # Matches 384-dim vectors
+        return self._model
+
     def initialize_collection(self):
         """Create or recreate the Qdrant collection as per meta.json."""
         try:
+            vector_params = {"size": 384, "distance": models.Distance.COSINE}
+            if QDRANT_VECTOR_DATATYPE == "float16":
+                vector_params["datatype"] = models.Datatype.FLOAT16
             self.client.recreate_collection(
                 collection_name=self.collection_name,
-                vectors_config=models.VectorParams(
-                    size=384,
-                    distance=models.Distance.COSINE
-                )
+                vectors_config=models.VectorParams(**vector_params)
             )
             logger.info(f"Initialized Qdrant collection: {self.collection_name}")
         except Exception as e: